@@ -1,5 +1,6 @@
 # accounts/apps.py
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AccountsConfig(AppConfig):
@@ -8,4 +9,7 @@ class AccountsConfig(AppConfig):
     
     def ready(self):
         """Import signals when the app is ready"""
-        import accounts.signals
\ No newline at end of file
+        import accounts.signals
+        from accounts.tokens import ensure_token_expiry_index
+
+        post_migrate.connect(ensure_token_expiry_index, sender=self)
\ No newline at end of file
@@ -0,0 +1,126 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from utils.instrumentation import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+USER_STATUS_KEY = 'accounts:user_status:{}'
+
+# Token claims added by CustomTokenObtainPairSerializer.get_token
+CLAIM_FIELDS = ('email', 'full_name', 'phone_number')
+# Flags that decide access; never trusted from the token, always from the status cache
+STATUS_FIELDS = ('is_active', 'is_staff', 'is_superuser', 'user_type')
+
+
+def get_user_status(user_id):
+    """
+    Access-relevant flags of a user, cached for AUTH_USER_STATUS_CACHE_TIMEOUT seconds.
+    Returns None when the user no longer exists.
+    """
+    key = USER_STATUS_KEY.format(user_id)
+    status = cache.get(key)
+    record_cache_lookup(status is not None)
+    if status is not None:
+        return status or None
+
+    User = get_user_model()
+    row = User.objects.filter(pk=user_id).values(*STATUS_FIELDS, 'updated_at', 'password').first()
+    if row is None:
+        # Cache the miss too, as an empty dict, so a deleted user's tokens can't force a query per request
+        cache.set(key, {}, settings.AUTH_USER_STATUS_CACHE_TIMEOUT)
+        return None
+
+    status = {field: row[field] for field in STATUS_FIELDS}
+    status['updated_at'] = row['updated_at'].timestamp()
+    status['password_hash'] = get_md5_hash_password(row['password'])
+    cache.set(key, status, settings.AUTH_USER_STATUS_CACHE_TIMEOUT)
+    return status
+
+
+def invalidate_user_status(user_id):
+    cache.delete(USER_STATUS_KEY.format(user_id))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that skips the per-request user SELECT on safe methods.
+
+    For GET/HEAD/OPTIONS the user is built from the token's claims. Its flags come
+    from a short-lived cached status entry, so deactivation and role changes
+    take effect within AUTH_USER_STATUS_CACHE_TIMEOUT; accounts.signals drops
+    the entry as soon as the user row is saved or deleted. Any other field is
+    left deferred and loads from the database on first access.
+
+    Writes, tokens without the profile claims (e.g. minted by
+    RefreshToken.for_user), and tokens issued before the user's last profile
+    change all take the regular database lookup.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if request.method in SAFE_METHODS:
+            user = self.get_user_from_claims(validated_token)
+            if user is not None:
+                return user, validated_token
+
+        return self.get_user(validated_token), validated_token
+
+    def get_user_from_claims(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        claims = {field: validated_token.get(field) for field in CLAIM_FIELDS}
+        issued_at = validated_token.get('iat')
+        if issued_at is None or any(value is None for value in claims.values()):
+            return None
+
+        status = get_user_status(user_id)
+        if status is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not status['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != status['password_hash']
+        ):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        if int(status['updated_at']) > issued_at:
+            # Profile changed after this token was issued; its claims may be stale
+            return None
+
+        values = {
+            self.user_model._meta.pk.attname: self.user_model._meta.pk.to_python(user_id),
+            **claims,
+            **{field: status[field] for field in STATUS_FIELDS},
+        }
+        # from_db leaves every field not passed here deferred (lazy-loaded)
+        fields = [f.attname for f in self.user_model._meta.concrete_fields if f.attname in values]
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model),
+            fields,
+            [values[name] for name in fields],
+        )
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+# Each hasher keeps Django's algorithm name, so stored hashes stay readable by the
+# stock hashers, and must_update() compares against the tuned parameters: a hash
+# made with different ones is re-encoded the next time its owner logs in.
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id with cost parameters from PASSWORD_ARGON2_* settings"""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """scrypt with cost parameters from PASSWORD_SCRYPT_* settings"""
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+    # Only a ceiling: OpenSSL's default (32 MiB) rejects work factors above 2**14 at r=8,
+    # including hashes made under an earlier, higher setting
+    maxmem = 2 ** 30
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the iteration count from PASSWORD_PBKDF2_ITERATIONS"""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
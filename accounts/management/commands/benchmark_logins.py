@@ -0,0 +1,81 @@
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure logins/sec against a running server, e.g. one started with the Procfile's "
+        "gunicorn command. Creates active benchmark users in the server's database; "
+        "only run against a scratch deployment with AUTH_THROTTLE_ENABLED=False."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running server")
+        parser.add_argument("--concurrency", type=int, default=4, help="Parallel clients")
+        parser.add_argument("--duration", type=float, default=10, help="Seconds to run")
+        parser.add_argument("--users", type=int, default=10, help="Distinct accounts to log in as")
+        parser.add_argument("--password", default="Benchmark-pass-123")
+
+    def handle(self, *args, **options):
+        accounts = self.ensure_users(options["users"], options["password"])
+        url = options["url"].rstrip("/") + "/auth/login/"
+        deadline = time.monotonic() + options["duration"]
+        lock = threading.Lock()
+        latencies, errors = [], []
+
+        def client(index):
+            n = index
+            while time.monotonic() < deadline:
+                body = json.dumps({"email": accounts[n % len(accounts)], "password": options["password"]}).encode()
+                request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=30) as response:
+                        response.read()
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        latencies.append(elapsed)
+                except (urllib.error.URLError, OSError) as e:
+                    with lock:
+                        errors.append(str(e))
+                n += options["concurrency"]
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(options["concurrency"])]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        if not latencies:
+            self.stderr.write(f"No successful logins; first error: {errors[0] if errors else 'none'}")
+            return
+        latencies.sort()
+        self.stdout.write(
+            f"{len(latencies)} logins in {elapsed:.1f}s: {len(latencies) / elapsed:.1f} logins/sec, "
+            f"p50 {statistics.median(latencies):.1f} ms, p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f} ms, "
+            f"{len(errors)} errors"
+        )
+
+    def ensure_users(self, count, password):
+        User = get_user_model()
+        emails = []
+        for i in range(count):
+            email = f"benchmark-login-{i}@example.com"
+            user, created = User.objects.get_or_create(
+                email=email,
+                defaults={"full_name": f"Benchmark {i}", "phone_number": f"07009{i:05d}", "is_active": True},
+            )
+            if created or not user.check_password(password):
+                user.set_password(password)
+                user.save()
+            emails.append(email)
+        return emails
@@ -0,0 +1,77 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the configured password hashers: hashes/sec across concurrent threads "
+        "and p50/p99 latency of authenticate() while all threads are logging in."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4, help="Concurrent hashing threads (gunicorn --threads)")
+        parser.add_argument("--seconds", type=float, default=5, help="Duration of the throughput run per hasher")
+        parser.add_argument("--logins", type=int, default=200, help="authenticate() calls per hasher")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        password = "Benchmark-pass-123"
+        user, _ = User.objects.get_or_create(
+            email="benchmark-hasher@example.com",
+            defaults={"full_name": "Benchmark", "phone_number": "0700000998", "is_active": True},
+        )
+
+        for path in settings.PASSWORD_HASHERS:
+            with override_settings(PASSWORD_HASHERS=[path]):
+                hasher = get_hasher("default")
+                rate = self.hashes_per_second(hasher, password, options["threads"], options["seconds"])
+
+                user.set_password(password)
+                user.save(update_fields=["password"])
+                latencies = self.login_latencies(user.email, password, options["threads"], options["logins"])
+
+            self.stdout.write(
+                f"{hasher.algorithm:<14} {rate:8.1f} hashes/sec ({options['threads']} threads)   "
+                f"login p50 {statistics.median(latencies):7.1f} ms   "
+                f"p99 {latencies[max(int(len(latencies) * 0.99) - 1, 0)]:7.1f} ms"
+            )
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def hashes_per_second(self, hasher, password, threads, seconds):
+        deadline = time.monotonic() + seconds
+        counts = [0] * threads
+
+        def worker(index):
+            while time.monotonic() < deadline:
+                hasher.encode(password, hasher.salt())
+                counts[index] += 1
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        started = time.monotonic()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return sum(counts) / (time.monotonic() - started)
+
+    def login_latencies(self, email, password, threads, logins):
+        def login(_):
+            started = time.perf_counter()
+            try:
+                if authenticate(email=email, password=password) is None:
+                    raise RuntimeError("benchmark user failed to authenticate")
+                return (time.perf_counter() - started) * 1000
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            return sorted(pool.map(login, range(logins)))
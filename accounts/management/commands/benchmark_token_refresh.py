@@ -0,0 +1,90 @@
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from accounts.views import AuthViewSet
+
+BENCH_PREFIX = "bench-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure /auth/refresh_token/ latency as the token tables grow. "
+        "Seeds synthetic token rows; only run against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default="0,100000,1000000",
+            help="Comma-separated outstanding-token table sizes to measure at",
+        )
+        parser.add_argument("--refreshes", type=int, default=200)
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--cleanup", action="store_true", help="Delete the seeded rows afterwards")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(
+            email="benchmark-refresh@example.com",
+            defaults={"full_name": "Benchmark", "phone_number": "0700000999", "is_active": True},
+        )
+        view = AuthViewSet.as_view({"post": "refresh_token"})
+        factory = APIRequestFactory()
+
+        for size in sorted(int(value) for value in options["sizes"].split(",")):
+            self.grow(size, options["batch_size"])
+            timings, queries = [], []
+            token = str(RefreshToken.for_user(user))
+            for _ in range(options["refreshes"]):
+                request = factory.post("/auth/refresh_token/", {"refresh": token}, format="json")
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = view(request)
+                    timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    self.stderr.write(f"Refresh failed: {response.data}")
+                    return
+                queries.append(len(captured))
+                token = response.data.get("refresh", token)
+
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            self.stdout.write(
+                f"{OutstandingToken.objects.count():>9} outstanding tokens: "
+                f"p50 {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms, "
+                f"{statistics.mean(queries):.1f} queries/refresh"
+            )
+
+        if options["cleanup"]:
+            OutstandingToken.objects.filter(jti__startswith=BENCH_PREFIX).delete()
+            self.stdout.write("Removed seeded tokens")
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def grow(self, size, batch_size):
+        """Add synthetic rows until the table holds `size` tokens; every other one blacklisted"""
+        missing = size - OutstandingToken.objects.count()
+        expires_at = aware_utcnow() + timedelta(days=7)
+        while missing > 0:
+            count = min(batch_size, missing)
+            tokens = OutstandingToken.objects.bulk_create([
+                OutstandingToken(jti=f"{BENCH_PREFIX}{uuid.uuid4().hex}", token="x", expires_at=expires_at)
+                for _ in range(count)
+            ])
+            if connection.features.can_return_rows_from_bulk_insert:
+                BlacklistedToken.objects.bulk_create([BlacklistedToken(token=t) for t in tokens[::2]])
+            else:
+                ids = OutstandingToken.objects.filter(
+                    jti__in=[t.jti for t in tokens[::2]]
+                ).values_list("id", flat=True)
+                BlacklistedToken.objects.bulk_create([BlacklistedToken(token_id=i) for i in ids])
+            missing -= count
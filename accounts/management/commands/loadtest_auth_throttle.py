@@ -0,0 +1,59 @@
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+
+from accounts.views import AuthViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a credential-stuffing burst of wrong-password logins through the login view, "
+        "with and without throttling, and report status codes and CPU seconds spent. "
+        "Creates one benchmark user; only run against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Login attempts per run")
+        parser.add_argument(
+            "--ips", type=int, default=1,
+            help="Spread attempts over this many client addresses (distributed attack)",
+        )
+        parser.add_argument("--email", default="benchmark-throttle@example.com")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if not User.objects.filter(email=options["email"]).exists():
+            User.objects.create_user(
+                email=options["email"], full_name="Benchmark", phone_number="0700000997",
+                password="Benchmark-pass-123", is_active=True,
+            )
+
+        for enabled in (False, True):
+            cache.clear()
+            with override_settings(AUTH_THROTTLE_ENABLED=enabled):
+                statuses, cpu, wall = self.burst(options["email"], options["requests"], options["ips"])
+            label = "throttled  " if enabled else "unthrottled"
+            summary = ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items()))
+            self.stdout.write(
+                f"{label} {options['requests']} attempts in {wall:.2f} s wall, {cpu:.2f} s CPU "
+                f"({cpu / options['requests'] * 1000:.2f} ms CPU/attempt) -> {summary}"
+            )
+        self.stdout.write(self.style.SUCCESS("Load test complete"))
+
+    def burst(self, email, count, ips):
+        view = AuthViewSet.as_view({"post": "login"})
+        factory = APIRequestFactory()
+        statuses = Counter()
+        cpu_started, wall_started = time.process_time(), time.perf_counter()
+        for n in range(count):
+            request = factory.post(
+                "/auth/login/", {"email": email, "password": f"wrong-{n}"}, format="json",
+                REMOTE_ADDR=f"10.{(n % ips) // 65536 % 256}.{(n % ips) // 256 % 256}.{n % ips % 256}",
+            )
+            statuses[view(request).status_code] += 1
+        return statuses, time.process_time() - cpu_started, time.perf_counter() - wall_started
@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import VerificationCode
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired and already-used verification codes in batches. "
+        "Schedule it (e.g. every 15 minutes from cron) to keep the table at the size of the live window."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--grace-minutes", type=int, default=0,
+            help="Keep expired codes this much longer, e.g. for support lookups",
+        )
+        parser.add_argument("--sleep", type=float, default=0, help="Seconds to pause between batches")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(
+            minutes=settings.VERIFICATION_CODE_EXPIRY_MINUTES + options["grace_minutes"]
+        )
+        stale = VerificationCode.objects.filter(Q(is_verified=True) | Q(created_on__lt=cutoff))
+        deleted = 0
+
+        while True:
+            # Oldest first along the created_on index: the expired rows come first,
+            # and once they are gone only the live window is left to scan
+            ids = list(stale.order_by("created_on").values_list("id", flat=True)[:options["batch_size"]])
+            if not ids:
+                break
+            VerificationCode.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired or used verification codes"))
@@ -133,6 +133,19 @@ class User(AbstractBaseUser, PermissionsMixin):
     def display_name(self):
         return self.full_name if self.full_name else self.email
 
+    def record_login(self):
+        """
+        Coalesced last_login: written at most once per LAST_LOGIN_UPDATE_INTERVAL
+        seconds, with a plain UPDATE so updated_at and post_save receivers are untouched.
+        """
+        now = timezone.now()
+        interval = timedelta(seconds=settings.LAST_LOGIN_UPDATE_INTERVAL)
+        if self.last_login is not None and now - self.last_login < interval:
+            return False
+        User.objects.filter(pk=self.pk).update(last_login=now)
+        self.last_login = now
+        return True
+
 
 class VerificationCode(models.Model):
 
@@ -164,8 +177,12 @@ class VerificationCode(models.Model):
         verbose_name_plural = 'Verification Codes'
         ordering = ['-created_on']
         indexes = [
-            models.Index(fields=['code']),
-            models.Index(fields=['email', 'is_verified']),
+            # Exactly the verify/reset lookup: email + code + label among unused codes
+            models.Index(
+                fields=['email', 'label', 'code'],
+                name='verification_unused_idx',
+                condition=models.Q(is_verified=False),
+            ),
             models.Index(fields=['created_on']),
         ]
 
@@ -1,9 +1,9 @@
-from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from accounts.models import User
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from accounts.tokens import CachedBlacklistRefreshToken
 
 User = get_user_model()
 
@@ -103,19 +103,14 @@ class VerifyEmailSerializer(serializers.Serializer):
     def validate(self, attrs):
         """Verify the code and extract user"""
         from accounts.models import VerificationCode  # Import here to avoid circular import
+        from accounts.verification import get_code_store
         
         email = attrs['email']
         code = attrs['code']
         
         # Find verification code
-        try:
-            verification = VerificationCode.objects.get(
-                email=email,
-                code=code,
-                label=VerificationCode.REGISTER,
-                is_verified=False
-            )
-        except VerificationCode.DoesNotExist:
+        verification = get_code_store().lookup(email, code, VerificationCode.REGISTER)
+        if verification is None:
             raise serializers.ValidationError("Invalid verification code or email")
         
         # Check if expired
@@ -198,6 +193,7 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
     def validate(self, attrs):
         """Verify passwords match and code is valid"""
         from accounts.models import VerificationCode  # Import here to avoid circular import
+        from accounts.verification import get_code_store
         
         if attrs['new_password'] != attrs['new_password_confirm']:
             raise serializers.ValidationError(
@@ -208,14 +204,8 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         code = attrs['code']
         
         # Find verification code
-        try:
-            verification = VerificationCode.objects.get(
-                email=email,
-                code=code,
-                label=VerificationCode.RESET_PASSWORD,
-                is_verified=False
-            )
-        except VerificationCode.DoesNotExist:
+        verification = get_code_store().lookup(email, code, VerificationCode.RESET_PASSWORD)
+        if verification is None:
             raise serializers.ValidationError("Invalid reset code or email")
         
         # Check if expired
@@ -253,9 +243,11 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Custom JWT serializer with email-based authentication and custom claims"""
     
     username_field = 'email'  
+    token_class = CachedBlacklistRefreshToken
     
     def validate(self, attrs):
         data = super().validate(attrs)
+        self.user.record_login()
 
         # Check if email is verified (user is active)
         if not self.user.is_active:
@@ -271,8 +263,6 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         """Add custom claims to token"""
-        # Update last login
-        User.objects.filter(id=user.id).update(last_login=timezone.now())      
         token = super().get_token(user)        
         
         # Add custom claims
@@ -1,4 +1,4 @@
-from django.db.models.signals import pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.conf import settings
 import logging
@@ -35,4 +35,13 @@ def delete_user_verification_codes(sender, instance, **kwargs):
         code_count = VerificationCode.objects.filter(user=instance).count()
         logger.info(f"Will delete {code_count} verification codes for user {instance.email}")
     except Exception as e:
-        logger.error(f"Error with verification codes for user {instance.email}: {str(e)}")
\ No newline at end of file
+        logger.error(f"Error with verification codes for user {instance.email}: {str(e)}")
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user_status(sender, instance, **kwargs):
+    """Drop the cached status so claim-based authentication sees the change immediately"""
+    from accounts.authentication import invalidate_user_status
+
+    invalidate_user_status(instance.pk)
@@ -1,10 +1,27 @@
-from django.test import TestCase
-from unittest.mock import patch
+from django.conf import settings
+from django.test import TestCase, override_settings
+from unittest.mock import Mock, patch
 from django.contrib.auth import get_user_model
-from rest_framework.test import APIClient
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework import status
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import ClaimsJWTAuthentication
+from .tokens import CachedBlacklistRefreshToken
+from .verification import get_code_store
 from .models import User, VerificationCode
+from .serializers import CustomTokenObtainPairSerializer
 
 User = get_user_model()
 
@@ -291,4 +308,347 @@ class UpdateProfileTestCase(TestCase):
     def test_update_profile_unauthenticated(self):
         data = {'full_name': 'Updated Name'}
         response = self.client.patch(self.update_url, data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ClaimsJWTAuthenticationTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.auth = ClaimsJWTAuthentication()
+        self.user = User.objects.create_user(
+            email='mutheo2026@gmail.com',
+            full_name='Test User',
+            phone_number='0780000000',
+            password='testpass123',
+            is_active=True
+        )
+        self.access = str(CustomTokenObtainPairSerializer.get_token(self.user).access_token)
+
+    def authenticate(self, method='get', token=None):
+        request = getattr(self.factory, method)('/', HTTP_AUTHORIZATION=f'Bearer {token or self.access}')
+        return self.auth.authenticate(Request(request))
+
+    def test_read_builds_user_from_claims(self):
+        self.authenticate()
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, self.user.email)
+        self.assertEqual(user.user_type, User.CUSTOMER)
+        self.assertTrue(user.is_authenticated)
+
+    def test_unloaded_fields_load_lazily(self):
+        user, _ = self.authenticate()
+        self.assertEqual(user.date_joined, self.user.date_joined)
+
+    def test_write_loads_user_from_database(self):
+        self.authenticate()
+        with self.assertNumQueries(1):
+            self.authenticate('post')
+
+    def test_token_without_profile_claims_falls_back(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate(token=token)
+        self.assertEqual(user, self.user)
+
+    def test_deactivation_invalidates_cached_status(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+
+class TokenBlacklistTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.refresh_url = '/auth/refresh_token/'
+        self.user = User.objects.create_user(
+            email='mutheo2026@gmail.com',
+            full_name='Test User',
+            phone_number='0780000000',
+            password='testpass123',
+            is_active=True
+        )
+
+    def test_rotated_token_cannot_be_reused(self):
+        refresh = str(RefreshToken.for_user(self.user))
+        response = self.client.post(self.refresh_url, {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('refresh', response.data)
+
+        response = self.client.post(self.refresh_url, {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoked_jti_answered_from_cache(self):
+        token = CachedBlacklistRefreshToken(str(RefreshToken.for_user(self.user)))
+        token.blacklist()
+        with self.assertNumQueries(0):
+            with self.assertRaises(TokenError):
+                CachedBlacklistRefreshToken(str(token))
+
+    def test_prune_tokens_removes_only_expired(self):
+        expired = RefreshToken.for_user(self.user)
+        CachedBlacklistRefreshToken(str(expired)).blacklist()
+        OutstandingToken.objects.filter(jti=expired['jti']).update(expires_at=timezone.now() - timedelta(days=1))
+        live = RefreshToken.for_user(self.user)
+
+        call_command('prune_tokens', '--batch-size', '1', stdout=StringIO())
+
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [live['jti']])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    def test_prune_tokens_follows_expiry_not_id_order(self):
+        now = timezone.now()
+        live = OutstandingToken.objects.create(jti='live', token='x', expires_at=now + timedelta(days=1))
+        # Written at revocation time: a newer id for a token that expired long ago
+        revoked = OutstandingToken.objects.create(jti='revoked', token='x', expires_at=now - timedelta(days=2))
+        BlacklistedToken.objects.create(token=revoked)
+        OutstandingToken.objects.create(jti='expired', token='x', expires_at=now - timedelta(days=1))
+
+        call_command('prune_tokens', '--batch-size', '1', stdout=StringIO())
+
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [live.jti])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    def test_outstanding_token_expiry_is_indexed(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, OutstandingToken._meta.db_table)
+        self.assertIn(['expires_at'], [c['columns'] for c in constraints.values() if c['index']])
+
+
+class LoginRefreshWritesTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.login_url = '/auth/login/'
+        self.refresh_url = '/auth/refresh_token/'
+        self.user = User.objects.create_user(
+            email='mutheo2026@gmail.com',
+            full_name='Test User',
+            phone_number='0780000000',
+            password='testpass123',
+            is_active=True
+        )
+
+    def writes(self, method, url, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        statements = [q['sql'].split(None, 1)[0].upper() for q in queries.captured_queries]
+        return response, [s for s in statements if s in ('INSERT', 'UPDATE', 'DELETE')]
+
+    def test_login_writes_last_login_at_most_once_per_interval(self):
+        credentials = {'email': self.user.email, 'password': 'testpass123'}
+        _, writes = self.writes('post', self.login_url, credentials)
+        self.assertEqual(writes, ['UPDATE'])
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+        _, writes = self.writes('post', self.login_url, credentials)
+        self.assertEqual(writes, [])
+
+    def test_refresh_rotates_without_loading_user(self):
+        response = self.client.post(
+            self.login_url, {'email': self.user.email, 'password': 'testpass123'}, format='json'
+        )
+        refresh = response.data['refresh']
+
+        with CaptureQueriesContext(connection) as queries:
+            response, writes = self.writes('post', self.refresh_url, {'refresh': refresh})
+        # Outstanding + blacklist rows for the rotated token; the user is only read for the cached status
+        self.assertEqual(writes, ['INSERT', 'INSERT'])
+        user_reads = [q for q in queries.captured_queries if 'FROM "accounts_user"' in q['sql']]
+        self.assertEqual(len(user_reads), 1)
+        self.assertNotEqual(response.data['refresh'], refresh)
+        self.assertEqual(RefreshToken(response.data['refresh'])['email'], self.user.email)
+
+
+@override_settings(
+    PASSWORD_HASHERS=[
+        'accounts.hashers.TunedArgon2PasswordHasher',
+        'accounts.hashers.TunedPBKDF2PasswordHasher',
+    ],
+    PASSWORD_ARGON2_TIME_COST=1,
+    PASSWORD_ARGON2_MEMORY_COST=1024,
+    PASSWORD_PBKDF2_ITERATIONS=1000,
+)
+class PasswordRehashTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.login_url = '/auth/login/'
+        self.user = User.objects.create_user(
+            email='mutheo2026@gmail.com',
+            full_name='Test User',
+            phone_number='0780000000',
+            is_active=True
+        )
+        self.credentials = {'email': self.user.email, 'password': 'testpass123'}
+
+    def login(self):
+        response = self.client.post(self.login_url, self.credentials, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        return self.user.password
+
+    def test_legacy_hash_upgraded_on_login(self):
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password('testpass123', hasher='pbkdf2_sha256')
+        )
+        self.assertTrue(self.login().startswith('argon2$argon2id$'))
+
+    def test_retuned_parameters_rehash_on_login(self):
+        self.user.set_password('testpass123')
+        self.user.save()
+        self.assertIn('m=1024,', self.user.password)
+
+        with self.settings(PASSWORD_ARGON2_MEMORY_COST=2048):
+            self.assertIn('m=2048,', self.login())
+
+
+class VerificationCodeStoreTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.verify_url = '/auth/verify_email/'
+        self.user = User.objects.create_user(
+            email='mutheo2026@gmail.com',
+            full_name='Test User',
+            phone_number='0780000000',
+            password='testpass123'
+        )
+
+    def verify(self, code):
+        return self.client.post(self.verify_url, {'email': self.user.email, 'code': code}, format='json')
+
+    def test_new_code_replaces_unused_one(self):
+        store = get_code_store()
+        store.issue(self.user, VerificationCode.REGISTER)
+        code = store.issue(self.user, VerificationCode.REGISTER)
+        self.assertEqual(list(VerificationCode.objects.values_list('code', flat=True)), [code])
+
+        self.assertEqual(self.verify(code).status_code, status.HTTP_200_OK)
+        self.assertTrue(VerificationCode.objects.get().is_verified)
+        self.assertEqual(self.verify(code).status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(VERIFICATION_CODE_STORE='cache')
+    def test_cache_store_never_touches_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            code = get_code_store().issue(self.user, VerificationCode.REGISTER)
+            response = self.verify(code)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('accounts_verificationcode' in q['sql'] for q in queries.captured_queries))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_active)
+        self.assertEqual(self.verify(code).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_prune_verification_codes(self):
+        store = get_code_store()
+        store.issue(self.user, VerificationCode.RESET_PASSWORD)
+        VerificationCode.objects.update(created_on=timezone.now() - timedelta(hours=1))
+        used = VerificationCode.objects.create(
+            user=self.user, email=self.user.email, code='111111',
+            label=VerificationCode.REGISTER, is_verified=True
+        )
+        live = store.issue(self.user, VerificationCode.REGISTER)
+
+        call_command('prune_verification_codes', '--batch-size', '1', stdout=StringIO())
+
+        self.assertEqual(list(VerificationCode.objects.values_list('code', flat=True)), [live])
+        self.assertFalse(VerificationCode.objects.filter(pk=used.pk).exists())
+
+
+
+@override_settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={
+    'login_ip': '5/min', 'login_email': '3/min',
+    'register_ip': '5/hour', 'register_email': '3/hour',
+    'verification_ip': '5/hour', 'verification_email': '3/hour',
+    'code_ip': '5/hour', 'code_email': '3/hour',
+}))
+class AuthThrottleTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.login_url = '/auth/login/'
+
+    def login(self, email, ip='10.0.0.1'):
+        return self.client.post(
+            self.login_url, {'email': email, 'password': 'wrongpass'}, format='json', REMOTE_ADDR=ip
+        )
+
+    def test_email_bucket_applies_across_addresses(self):
+        responses = [self.login('victim@example.com', ip=f'10.0.0.{n}') for n in range(4)]
+        self.assertEqual([r.status_code for r in responses[:3]], [status.HTTP_401_UNAUTHORIZED] * 3)
+        self.assertEqual(responses[0]['X-RateLimit-Limit'], '3')
+        self.assertEqual(responses[0]['X-RateLimit-Remaining'], '2')
+        self.assertEqual(responses[3].status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(responses[3]['X-RateLimit-Remaining'], '0')
+        self.assertIn('Retry-After', responses[3])
+
+    def test_ip_bucket_applies_across_emails(self):
+        codes = [self.login(f'user{n}@example.com').status_code for n in range(6)]
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertNotIn(status.HTTP_429_TOO_MANY_REQUESTS, codes[:5])
+        # Another client is unaffected
+        self.assertEqual(self.login('user0@example.com', ip='10.0.0.2').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotating_forwarded_for_is_still_throttled_per_client(self):
+        # The platform router appends the real client address after whatever the client sent
+        codes = [
+            self.client.post(
+                self.login_url, {'email': f'user{n}@example.com', 'password': 'wrongpass'}, format='json',
+                REMOTE_ADDR='10.9.9.9', HTTP_X_FORWARDED_FOR=f'203.0.113.{n}, 10.0.0.1',
+            ).status_code
+            for n in range(6)
+        ]
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_verification_endpoints_share_scope(self):
+        url = '/auth/resend_verification/'
+        for _ in range(3):
+            self.client.post(url, {'email': 'nobody@example.com'}, format='json')
+        response = self.client.post('/auth/password_reset_request/', {'email': 'nobody@example.com'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_code_guesses_are_limited_per_email_and_ip(self):
+        guess = {'email': 'victim@example.com', 'code': '000000', 'new_password': 'N3wPassw0rd!x'}
+        codes = [
+            self.client.post('/auth/password_reset_confirm/', guess, format='json', REMOTE_ADDR=f'10.0.1.{n}').status_code
+            for n in range(3)
+        ]
+        self.assertNotIn(status.HTTP_429_TOO_MANY_REQUESTS, codes)
+        # Verification shares the per-email budget for guessing codes
+        response = self.client.post(
+            '/auth/verify_email/', {'email': 'victim@example.com', 'code': '000000'}, format='json', REMOTE_ADDR='10.0.1.9'
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        codes = [
+            self.client.post(
+                '/auth/verify_email/', {'email': f'user{n}@example.com', 'code': '000000'}, format='json'
+            ).status_code
+            for n in range(6)
+        ]
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertNotIn(status.HTTP_429_TOO_MANY_REQUESTS, codes[:5])
+
+    def test_falls_back_to_process_buckets_when_cache_fails(self):
+        broken = Mock(**{'get.side_effect': ConnectionError, 'set.side_effect': ConnectionError})
+        with patch('rest_framework.throttling.SimpleRateThrottle.cache', broken):
+            codes = [self.login('fallback@example.com').status_code for _ in range(4)]
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(AUTH_THROTTLE_ENABLED=False)
+    def test_can_be_disabled(self):
+        codes = {self.login('victim@example.com').status_code for _ in range(5)}
+        self.assertEqual(codes, {status.HTTP_401_UNAUTHORIZED})
@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import math
+
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+# Per-process store used only while the shared cache is unreachable
+fallback_cache = LocMemCache('accounts-throttle-fallback', {'OPTIONS': {'MAX_ENTRIES': 10000}})
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket over the cache framework, for a rate such as "5/min": a bucket of
+    5 tokens refilled continuously at one token per 12 seconds. Implemented as
+    GCRA, so each key stores a single timestamp (when the bucket will be full
+    again) instead of SimpleRateThrottle's list of request times.
+
+    Falls back to a per-process bucket if the shared cache raises, so an outage
+    of Redis degrades throttling to per-worker instead of disabling it.
+    Quota for the response headers is left on `request.rate_limits`.
+    """
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def __init__(self, scope=None):
+        if scope is not None:
+            self.scope = scope
+        super().__init__()
+
+    def get_rate(self):
+        # Read at request time (not class creation) so REST_FRAMEWORK overrides apply
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def _get(self, key):
+        try:
+            return self.cache.get(key)
+        except Exception as e:
+            logger.error(f"Throttle cache unavailable, using in-process buckets: {str(e)}")
+            return fallback_cache.get(key)
+
+    def _set(self, key, value, timeout):
+        try:
+            self.cache.set(key, value, timeout)
+        except Exception:
+            fallback_cache.set(key, value, timeout)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        interval = self.duration / self.num_requests
+        # Theoretical arrival time: the moment the bucket would be full again
+        tat = max(self._get(self.key) or self.now, self.now)
+        new_tat = tat + interval
+
+        allowed = new_tat - self.now <= self.duration
+        if allowed:
+            self._set(self.key, new_tat, math.ceil(new_tat - self.now))
+            self.remaining = int((self.duration - (new_tat - self.now)) // interval)
+            self.reset = new_tat - self.now
+            self.wait_time = 0
+        else:
+            self.remaining = 0
+            self.reset = tat - self.now
+            # Time until one token has dripped back
+            self.wait_time = new_tat - self.duration - self.now
+
+        if not hasattr(request, 'rate_limits'):
+            request.rate_limits = []
+        request.rate_limits.append({
+            'scope': self.scope,
+            'limit': self.num_requests,
+            'remaining': self.remaining,
+            'reset': math.ceil(self.reset),
+        })
+        return allowed
+
+    def wait(self):
+        return math.ceil(self.wait_time) if self.wait_time else None
+
+
+class IPRateThrottle(TokenBucketThrottle):
+    """One bucket per client address (X-Forwarded-For aware via NUM_PROXIES)"""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class EmailRateThrottle(TokenBucketThrottle):
+    """One bucket per target email address, whichever IPs the requests come from"""
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not email or not isinstance(email, str):
+            return None
+        ident = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class RateLimitHeadersMixin:
+    """Report the tightest applied bucket as X-RateLimit-* headers"""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        limits = getattr(request, 'rate_limits', None)
+        if limits:
+            tightest = min(limits, key=lambda limit: (limit['remaining'], -limit['reset']))
+            response['X-RateLimit-Limit'] = str(tightest['limit'])
+            response['X-RateLimit-Remaining'] = str(tightest['remaining'])
+            response['X-RateLimit-Reset'] = str(tightest['reset'])
+        return response
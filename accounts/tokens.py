@@ -0,0 +1,123 @@
+from django.core.cache import cache
+from django.db import IntegrityError, connections, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+REVOKED_KEY = 'accounts:revoked_jti:{}'
+TOKEN_EXPIRY_INDEX_NAME = 'token_blacklist_outstanding_expires_at'
+
+
+def remember_revoked(jti, exp):
+    """Cache a revoked JTI until the token would have expired anyway"""
+    ttl = int(exp - aware_utcnow().timestamp())
+    if ttl > 0:
+        cache.set(REVOKED_KEY.format(jti), True, ttl)
+
+
+def is_revoked(jti):
+    """
+    Cache first, database second. Only revocations are cached: a "not revoked"
+    answer could go stale in another process the moment the token is blacklisted.
+    """
+    if cache.get(REVOKED_KEY.format(jti)):
+        return True
+    blacklisted = BlacklistedToken.objects.filter(token__jti=jti).values_list('token__expires_at', flat=True).first()
+    if blacklisted is None:
+        return False
+    remember_revoked(jti, blacklisted.timestamp())
+    return True
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """
+    RefreshToken whose blacklist lookups go through the revoked-JTI cache and
+    whose blacklist() is a single guarded INSERT instead of two get_or_creates.
+
+    Issuing a token writes nothing: the OutstandingToken row a blacklist entry
+    hangs off is created when the token is revoked, so logins and refreshes
+    don't each add a row to a table that only revocation reads.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        # Skip BlacklistMixin.for_user and its OutstandingToken INSERT
+        return Token.for_user.__func__(cls, user)
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """
+        Blacklist this token, raising TokenError if it already was. The unique
+        BlacklistedToken.token constraint makes this safe against two requests
+        racing to use the same token.
+        """
+        jti = self.payload[api_settings.JTI_CLAIM]
+        exp = self.payload['exp']
+
+        issued_at = self.payload.get('iat')
+        try:
+            # Tokens from for_user() have no row yet, so try the INSERT first
+            with transaction.atomic():
+                outstanding_id = OutstandingToken.objects.create(
+                    user_id=self.payload.get(api_settings.USER_ID_CLAIM),
+                    jti=jti,
+                    token=str(self),
+                    created_at=datetime_from_epoch(issued_at) if issued_at else None,
+                    expires_at=datetime_from_epoch(exp),
+                ).id
+        except IntegrityError:
+            # order_by('pk') replaces the model's default ordering by user, which would join accounts_user
+            outstanding_id = OutstandingToken.objects.filter(jti=jti).order_by('pk').values_list('id', flat=True).first()
+
+        try:
+            with transaction.atomic():
+                blacklisted = BlacklistedToken.objects.create(token_id=outstanding_id)
+        except IntegrityError:
+            remember_revoked(jti, exp)
+            raise TokenError(_("Token is blacklisted"))
+
+        remember_revoked(jti, exp)
+        return blacklisted, True
+
+
+class RotatingRefreshToken(CachedBlacklistRefreshToken):
+    """
+    For refresh-with-rotation, where the token is blacklisted right after it is
+    read. Construction only consults the cache; the database check is folded into
+    blacklist(), which the caller must invoke before issuing anything.
+    """
+
+    def check_blacklist(self):
+        if cache.get(REVOKED_KEY.format(self.payload[api_settings.JTI_CLAIM])):
+            raise TokenError(_("Token is blacklisted"))
+
+    def rotate(self):
+        """
+        Revoke this token and turn it into its successor in place, keeping the
+        user id and custom claims, as SimpleJWT's own refresh serializer does.
+        No user lookup and no second token mint.
+        """
+        self.blacklist()
+        self.set_jti()
+        self.set_exp()
+        self.set_iat()
+        return self
+
+
+def ensure_token_expiry_index(sender, using='default', **kwargs):
+    """
+    post_migrate hook indexing OutstandingToken.expires_at, which prune_tokens
+    walks in batches. The model belongs to simplejwt, so the index can't go in its Meta.
+    """
+    table = OutstandingToken._meta.db_table
+    connection = connections[using]
+    if table not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {TOKEN_EXPIRY_INDEX_NAME} ON {table} (expires_at)')
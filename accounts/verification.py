@@ -0,0 +1,78 @@
+import secrets
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+from accounts.models import VerificationCode
+
+CODE_KEY = 'accounts:verification:{}:{}'
+
+
+class DatabaseCodeStore:
+    """Codes live in the VerificationCode table; prune_verification_codes clears old rows"""
+
+    def issue(self, user, label):
+        code = VerificationCode.generate_code()
+        # A new code supersedes any unused one for the same purpose
+        VerificationCode.objects.filter(user=user, label=label, is_verified=False).delete()
+        VerificationCode.objects.create(user=user, email=user.email, code=code, label=label)
+        return code
+
+    def lookup(self, email, code, label):
+        """The unused code matching all three, with its user loaded, or None"""
+        return (
+            VerificationCode.objects
+            .filter(email=email, code=code, label=label, is_verified=False)
+            .select_related('user')
+            .first()
+        )
+
+    def consume(self, verification):
+        VerificationCode.objects.filter(pk=verification.pk).update(is_verified=True)
+
+
+class CacheCodeStore:
+    """
+    Codes live only in the cache, expiring with VERIFICATION_CODE_EXPIRY_MINUTES.
+    Issuing and checking a code never touch the VerificationCode table. Needs a
+    cache shared by every worker (REDIS_URL), not the per-process LocMemCache.
+    """
+
+    def key(self, email, label):
+        return CODE_KEY.format(label, email)
+
+    def issue(self, user, label):
+        code = VerificationCode.generate_code()
+        cache.set(
+            self.key(user.email, label),
+            {'code': code, 'user_id': str(user.pk), 'created_on': datetime.now(dt_timezone.utc).timestamp()},
+            settings.VERIFICATION_CODE_EXPIRY_MINUTES * 60,
+        )
+        return code
+
+    def lookup(self, email, code, label):
+        entry = cache.get(self.key(email, label))
+        if entry is None or not secrets.compare_digest(entry['code'], code):
+            return None
+        # Unsaved instance so callers can use is_expired/user like a stored row
+        return VerificationCode(
+            user_id=entry['user_id'],
+            email=email,
+            code=code,
+            label=label,
+            created_on=datetime.fromtimestamp(entry['created_on'], dt_timezone.utc),
+        )
+
+    def consume(self, verification):
+        cache.delete(self.key(verification.email, verification.label))
+
+
+CODE_STORES = {
+    'database': DatabaseCodeStore,
+    'cache': CacheCodeStore,
+}
+
+
+def get_code_store():
+    return CODE_STORES[settings.VERIFICATION_CODE_STORE]()
@@ -5,7 +5,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 
 from accounts.serializers import (
@@ -18,7 +18,11 @@ from accounts.serializers import (
     UserProfileSerializer,
     VerifyEmailSerializer,
 )
+from accounts.authentication import get_user_status
 from accounts.permissions import IsAdmin, IsOwnerOrAdmin
+from accounts.throttling import EmailRateThrottle, IPRateThrottle, RateLimitHeadersMixin
+from accounts.tokens import CachedBlacklistRefreshToken, RotatingRefreshToken
+from accounts.verification import get_code_store
 from utils.registration_verification import send_registration_verification
 from utils.password_reset_verification import send_password_reset_verification
 
@@ -63,9 +67,25 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response({"status": "User deactivated"})
 
 
-class AuthViewSet(viewsets.GenericViewSet):
+class AuthViewSet(RateLimitHeadersMixin, viewsets.GenericViewSet):
     permission_classes = [AllowAny]
     serializer_class = CustomTokenObtainPairSerializer
+    # Action -> rate scope; each scope has an "_ip" and an "_email" rate in DEFAULT_THROTTLE_RATES
+    throttle_scopes = {
+        "login": "login",
+        "register": "register",
+        "resend_verification": "verification",
+        "password_reset_request": "verification",
+        # 6-digit codes: the email bucket caps guesses per code, the IP bucket spraying across emails
+        "verify_email": "code",
+        "password_reset_confirm": "code",
+    }
+
+    def get_throttles(self):
+        scope = self.throttle_scopes.get(self.action)
+        if scope is None or not settings.AUTH_THROTTLE_ENABLED:
+            return []
+        return [IPRateThrottle(f"{scope}_ip"), EmailRateThrottle(f"{scope}_email")]
 
     def get_serializer_class(self):
         if self.action == "register":
@@ -123,15 +143,10 @@ class AuthViewSet(viewsets.GenericViewSet):
         user.save(update_fields=["is_active"])
         
         # Mark verification code as used
-        verification.is_verified = True
-        verification.save(update_fields=["is_verified"])
+        get_code_store().consume(verification)
 
         # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
-        refresh["full_name"] = user.full_name
-        refresh["phone_number"] = user.phone_number
-        refresh["email"] = user.email
-        refresh["user_type"] = user.user_type
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
 
         return Response(
             {
@@ -190,7 +205,7 @@ class AuthViewSet(viewsets.GenericViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        token = RefreshToken(refresh_token)
+        token = CachedBlacklistRefreshToken(refresh_token)
         token.blacklist()
         return Response({"message": "Successfully logged out"})
 
@@ -205,23 +220,37 @@ class AuthViewSet(viewsets.GenericViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            token = RefreshToken(refresh_token_str)
-            new_access_token = str(token.access_token)
-            response_data = {"access": new_access_token}
-
-           
             simple_jwt_settings = getattr(settings, 'SIMPLE_JWT', {})
-            if simple_jwt_settings.get('ROTATE_REFRESH_TOKENS', False):
-                try:
-                    token.blacklist()
-                except Exception:
-                    pass
-                user_id = token.payload.get('user_id')
-                user = User.objects.get(id=user_id)
-                new_refresh_token = RefreshToken.for_user(user)
-                response_data["refresh"] = str(new_refresh_token)
-
-            logger.info(f"Token refreshed successfully for user {token.payload.get('user_id')}")
+            rotate = simple_jwt_settings.get('ROTATE_REFRESH_TOKENS', False)
+
+            token_class = RotatingRefreshToken if rotate else CachedBlacklistRefreshToken
+            token = token_class(refresh_token_str)
+            user_id = token.payload.get('user_id')
+            issued_at = token.payload.get('iat', 0)
+
+            # Cached existence/is_active check instead of loading the user
+            user_status = get_user_status(user_id)
+            if user_status is None:
+                raise User.DoesNotExist
+            if not user_status['is_active']:
+                return Response(
+                    {"error": "User account is inactive"},
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
+
+            if rotate:
+                # Blacklists the old token (raising TokenError if it was already used)
+                # and reuses it as the new one; nothing else is written
+                token.rotate()
+            if int(user_status['updated_at']) > issued_at:
+                # Profile changed since this token was issued; re-mint with current claims
+                token = CustomTokenObtainPairSerializer.get_token(User.objects.get(id=user_id))
+
+            response_data = {"access": str(token.access_token)}
+            if rotate:
+                response_data["refresh"] = str(token)
+
+            logger.info(f"Token refreshed successfully for user {user_id}")
             return Response(response_data, status=status.HTTP_200_OK)
 
         except TokenError as e:
@@ -283,8 +312,7 @@ class AuthViewSet(viewsets.GenericViewSet):
         user.save(update_fields=["password"])
         
         # Mark reset code as used
-        verification.is_verified = True
-        verification.save(update_fields=["is_verified"])
+        get_code_store().consume(verification)
 
         return Response(
             {"message": "Password has been reset successfully."}, 
@@ -293,6 +321,8 @@ class AuthViewSet(viewsets.GenericViewSet):
 
 
 class ProfileViewSet(viewsets.GenericViewSet):
+    # `me` serializes the full row, so load it instead of building the user from token claims
+    authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = UserProfileSerializer
 
@@ -0,0 +1,18 @@
+# Loaded automatically by gunicorn from the working directory (Procfile, Dockerfile).
+# SERVER_MODE=wsgi (default): threaded sync workers on rwoogaBackend.wsgi.
+# SERVER_MODE=asgi: uvicorn workers on rwoogaBackend.asgi. Request bodies (media
+# uploads) and slow clients are handled on the event loop, and each view only
+# takes a thread once its request has fully arrived.
+# Imported as a module: gunicorn would read a top-level `config` as its own setting
+import decouple
+
+SERVER_MODE = decouple.config('SERVER_MODE', default='wsgi')
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'rwoogaBackend.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+elif SERVER_MODE == 'wsgi':
+    wsgi_app = 'rwoogaBackend.wsgi:application'
+    worker_class = 'gthread'
+else:
+    raise ValueError(f"SERVER_MODE must be 'wsgi' or 'asgi', not {SERVER_MODE!r}")
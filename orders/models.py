@@ -30,6 +30,11 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_recent_idx'),
+        ]
+
     def __str__(self):
         return f"Order {self.id} - {self.user.email}"
 
@@ -1,12 +1,14 @@
 from django.shortcuts import render
 from rest_framework import viewsets, permissions
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from utils.pagination import SelectablePagination
 from .models import Order
 from .serializers import OrderSerializer
 
 class OrderViewSet(viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SelectablePagination
     # queryset = Order.objects.all().order_by("total_amount")
 
     def get_queryset(self):
@@ -15,7 +17,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         if not self.request.user.is_authenticated:
             return Order.objects.none()
     
-        return Order.objects.filter(user=self.request.user)
+        return Order.objects.filter(user=self.request.user).order_by("-created_at", "-id")
 
     def perform_create(self, serializer):
         # Automatically link the order to the logged-in user
@@ -1,5 +1,7 @@
 from django.contrib import admin
 from .models import ServiceCategory, Product, ProductMedia, Feedback, CustomRequest, Wishlist, WishlistItem, Discount, ProductDiscount
+from .cache import bump_version
+from .ratings import recompute_ratings
 
 
 class ProductMediaInline(admin.TabularInline):
@@ -65,11 +67,17 @@ class FeedbackAdmin(admin.ModelAdmin):
     actions = ['make_published', 'make_unpublished']
     
     def make_published(self, request, queryset):
+        product_ids = list(queryset.values_list('product_id', flat=True).distinct())
         queryset.update(published=True)
+        bump_version('feedback')
+        recompute_ratings(Product.objects.filter(id__in=product_ids))
     make_published.short_description = "Publish selected feedback"
     
     def make_unpublished(self, request, queryset):
+        product_ids = list(queryset.values_list('product_id', flat=True).distinct())
         queryset.update(published=False)
+        bump_version('feedback')
+        recompute_ratings(Product.objects.filter(id__in=product_ids))
     make_unpublished.short_description = "Unpublish selected feedback"
 
 
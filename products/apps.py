@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        """Import signals when the app is ready"""
+        import products.signals
+        from products.search import ensure_search_index
+
+        post_migrate.connect(ensure_search_index, sender=self)
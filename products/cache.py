@@ -0,0 +1,88 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from utils.instrumentation import record_cache_lookup
+
+
+VERSION_KEY = 'products:version:{}'
+RESPONSE_KEY = 'products:response:{}:{}:{}'
+
+
+def _fresh_version():
+    # Seed from the clock so a version key evicted from the cache never
+    # comes back with a value that older cached responses were stored under
+    return int(time.time() * 1000)
+
+
+def bump_version(*model_names):
+    """Invalidate every cached response that depends on the given models"""
+    for name in model_names:
+        key = VERSION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_version(), None)
+
+
+def get_versions(model_names):
+    keys = [VERSION_KEY.format(name) for name in model_names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _fresh_version(), None)
+            versions[key] = cache.get(key)
+    return [str(versions[key]) for key in keys]
+
+
+class CachedReadMixin:
+    """
+    Read-through cache for anonymous list/retrieve requests.
+
+    The key combines the scheme, host, path, sorted query string and the current version
+    of every model in `cache_dependencies`; products.signals bumps those versions
+    on save/delete, so stale entries are simply never read again and expire.
+    """
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    def serves_from_cache(self, request):
+        return settings.PRODUCTS_CACHE_ENABLED and not request.user.is_authenticated
+
+    def get_cache_versions(self):
+        """Current version of every dependency; any write to one of them changes the result"""
+        return '.'.join(get_versions(self.cache_dependencies))
+
+    def get_response_cache_key(self, request):
+        query = sorted(request.query_params.lists())
+        # Pagination links in the cached data are absolute, so each host and scheme gets its own entry
+        origin = f'{request.scheme}://{request.get_host()}'
+        fingerprint = hashlib.md5(f'{origin}{request.path}?{query}'.encode()).hexdigest()
+        return RESPONSE_KEY.format(self.basename, fingerprint, self.get_cache_versions())
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        if not self.serves_from_cache(request):
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        record_cache_lookup(cached is not None)
+        if cached is not None:
+            data, status_code = cached
+            response = Response(data, status=status_code)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, (response.data, response.status_code), settings.PRODUCTS_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,95 @@
+import hashlib
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.pagination import PageNumberPagination
+
+from utils.pagination import KnownCountPaginator
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified for list and retrieve, answered with 304 before anything is serialized.
+
+    Anonymous lists served by CachedReadMixin take their ETag from the cache
+    version counters, so a cache hit or a 304 costs no query at all. Otherwise
+    the validators come from one cheap query: the newest `updated_at` and the row
+    count of the filtered queryset, which the paginator then reuses instead of
+    running its own COUNT(*) (or just the row's `updated_at` on detail). Related
+    rows shown in the payload touch their parent's `updated_at` (see products.signals).
+    Lists send no Last-Modified: a deleted row lowers the count but not the
+    newest timestamp, so If-Modified-Since alone would get a wrong 304.
+
+    The same data renders differently per format and viewer, so the ETag also
+    covers the negotiated media type and who is asking, and responses carry
+    `Vary: Accept, Authorization` for shared caches.
+    """
+    last_modified_field = 'updated_at'
+    vary_headers = ('Accept', 'Authorization')
+
+    def list(self, request, *args, **kwargs):
+        paginator = self.paginator
+        if hasattr(paginator, 'use_cursor') and paginator.use_cursor(request):
+            # Cursor pages exist to avoid COUNT(*); don't reintroduce it for a validator
+            return super().list(request, *args, **kwargs)
+
+        if hasattr(self, 'serves_from_cache') and self.serves_from_cache(request):
+            # Every write to a dependency, deletes included, bumps one of these versions
+            validator = f'versions:{self.get_cache_versions()}'
+        else:
+            queryset = self.filter_queryset(self.get_queryset())
+            stats = queryset.aggregate(last_modified=Max(self.last_modified_field), count=Count('pk'))
+            self.validated_count = stats['count']
+            stamp = stats['last_modified'].isoformat() if stats['last_modified'] else ''
+            validator = f'{stamp}|{stats["count"]}'
+        return self.conditional_response(request, validator, None, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            last_modified = self.get_queryset().filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).values_list(self.last_modified_field, flat=True).first()
+        except (TypeError, ValueError, ValidationError):
+            last_modified = None
+        if last_modified is None:
+            # Let the regular path produce the 404
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            request, last_modified.isoformat(), last_modified, super().retrieve, *args, **kwargs
+        )
+
+    def paginate_queryset(self, queryset):
+        count = getattr(self, 'validated_count', None)
+        if count is not None and isinstance(self.paginator, PageNumberPagination):
+            # Same filtered queryset the validator counted; skip the second COUNT(*)
+            self.paginator.django_paginator_class = partial(KnownCountPaginator, known_count=count)
+        return super().paginate_queryset(queryset)
+
+    def get_etag(self, request, validator):
+        query = sorted(request.query_params.lists())
+        media_type = getattr(request, 'accepted_media_type', '')
+        viewer = f'user:{request.user.pk}' if request.user.is_authenticated else 'anonymous'
+        return quote_etag(hashlib.md5(
+            f'{request.path}?{query}|{media_type}|{viewer}|{validator}'.encode()
+        ).hexdigest())
+
+    def conditional_response(self, request, validator, last_modified, handler, *args, **kwargs):
+        etag = self.get_etag(request, validator)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if not_modified is not None:
+            patch_vary_headers(not_modified, self.vary_headers)
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            patch_vary_headers(response, self.vary_headers)
+        return response
@@ -0,0 +1,35 @@
+from rest_framework import filters
+
+from .search import full_text_search, supports_full_text
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    `?search=` over the stored tsvector on Postgres, ranked and prefix-matched.
+    Pass `?search_mode=contains` for the plain ILIKE behaviour; other databases
+    (SQLite in local tests) always use it.
+    """
+    search_mode_param = 'search_mode'
+    FULLTEXT = 'fulltext'
+    CONTAINS = 'contains'
+
+    def get_search_mode(self, request, queryset):
+        mode = request.query_params.get(self.search_mode_param, self.FULLTEXT)
+        if mode == self.FULLTEXT and supports_full_text(queryset.db):
+            return self.FULLTEXT
+        return self.CONTAINS
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '')
+        if terms.strip() and self.get_search_mode(request, queryset) == self.FULLTEXT:
+            return full_text_search(queryset, terms)
+        return super().filter_queryset(request, queryset, view)
+
+
+class ProductOrderingFilter(filters.OrderingFilter):
+    """Order full-text matches by relevance unless the client asked for an explicit ordering"""
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', *self.get_default_ordering(view)]
+        return super().get_ordering(request, queryset, view)
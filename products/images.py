@@ -0,0 +1,129 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Width in pixels of each derivative; originals narrower than a size are never upscaled
+VARIANT_WIDTHS = {
+    'thumbnail': 320,
+    'medium': 800,
+    'large': 1600,
+}
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+VARIANT_DIR = 'products/images/variants'
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-variants')
+
+
+def _encode(image, fmt, options):
+    buffer = BytesIO()
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.save(buffer, fmt, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def build_variants(media):
+    """
+    Decode the original once and write every size/format to storage.
+    Returns the map stored on ProductMedia.variants.
+    """
+    largest = max(VARIANT_WIDTHS.values())
+    with default_storage.open(media.image.name, 'rb') as source:
+        image = Image.open(source)
+        # Let the JPEG decoder skip detail we are about to throw away
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    variants = {'source': media.image.name}
+    for size, width in VARIANT_WIDTHS.items():
+        width = min(width, image.width)
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+
+        files = {}
+        for ext, (fmt, options) in VARIANT_FORMATS.items():
+            name = f'{VARIANT_DIR}/{media.pk}/{size}.{ext}'
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            files[ext] = default_storage.save(name, _encode(resized, fmt, options))
+        variants[size] = {'width': width, 'height': height, **files}
+
+    return variants
+
+
+def generate_variants(media_id):
+    """Build and record the derivatives of one ProductMedia row. Safe to re-run."""
+    from .cache import bump_version
+    from .models import Product, ProductMedia
+
+    media = ProductMedia.objects.filter(pk=media_id).first()
+    if media is None or not media.image:
+        return None
+    try:
+        variants = build_variants(media)
+    except Exception as e:
+        logger.error(f"Failed to build image variants for media {media_id}: {str(e)}")
+        return None
+
+    # Plain UPDATEs so saving the result does not schedule another run
+    ProductMedia.objects.filter(pk=media_id).update(variants=variants)
+    Product.objects.filter(pk=media.product_id).update(updated_at=timezone.now())
+    bump_version('productmedia')
+    return variants
+
+
+def _generate_in_background(media_id):
+    try:
+        generate_variants(media_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(media):
+    """Queue derivative generation once the upload's transaction commits"""
+    if settings.IMAGE_VARIANTS_ASYNC:
+        transaction.on_commit(lambda: _executor.submit(_generate_in_background, media.pk))
+    else:
+        transaction.on_commit(lambda: generate_variants(media.pk))
+
+
+def variant_urls(media):
+    """srcset-style map {size: {width, height, webp, jpeg}} with public URLs, or None"""
+    variants = media.variants or {}
+    if variants.get('source') != (media.image.name if media.image else None):
+        return None
+    return {
+        size: {
+            'width': variants[size]['width'],
+            'height': variants[size]['height'],
+            **{ext: default_storage.url(variants[size][ext]) for ext in VARIANT_FORMATS},
+        }
+        for size in VARIANT_WIDTHS
+        if size in variants
+    }
+
+
+def thumbnail_url(media):
+    """Smallest JPEG derivative, falling back to the original until it exists"""
+    if not media or not media.image:
+        return None
+    urls = variant_urls(media)
+    if urls and 'thumbnail' in urls:
+        return urls['thumbnail']['jpeg']
+    return media.image.url
@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from products.models import ServiceCategory, Product, ProductMedia, Feedback, CustomRequest
+from products.product_counts import recompute_product_counts
+from products.slugs import allocate_slugs
+
+
+class Command(BaseCommand):
+    help = (
+        "Print EXPLAIN plans for the catalog's hot access paths and flag sequential scans. "
+        "Use --seed on a scratch database to reproduce the 100k-product benchmark."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Bulk-create this many published products first (never run against production)",
+        )
+        parser.add_argument("--analyze", action="store_true", help="Use EXPLAIN ANALYZE (Postgres)")
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self.seed(options["seed"])
+
+        product = Product.objects.filter(published=True).first()
+        if product is None:
+            self.stdout.write(self.style.WARNING("No published products; run with --seed first."))
+            return
+
+        access_paths = {
+            "published, newest first": Product.objects.filter(published=True).order_by("-created_at", "-id")[:20],
+            "category, newest first": Product.objects.filter(
+                published=True, category_id=product.category_id
+            ).order_by("-created_at")[:20],
+            "effective price range": Product.objects.filter(
+                published=True, effective_price__gte=Decimal("100"), effective_price__lte=Decimal("200")
+            ).order_by("effective_price")[:20],
+            "published, by name": Product.objects.filter(published=True).order_by("name")[:20],
+            "product feedback": Feedback.objects.filter(product_id=product.pk, published=True).order_by("-created_at")[:20],
+            "product media": ProductMedia.objects.filter(product_id=product.pk).order_by("display_order"),
+            "custom requests by status": CustomRequest.objects.filter(status="PENDING").order_by("-created_at")[:20],
+        }
+
+        explain_options = {"analyze": True} if options["analyze"] and connection.vendor == "postgresql" else {}
+        for label, queryset in access_paths.items():
+            plan = queryset.explain(**explain_options)
+            seq_scan = self.is_sequential_scan(plan)
+            style = self.style.WARNING if seq_scan else self.style.SUCCESS
+            self.stdout.write(style(f"== {label}{' (sequential scan)' if seq_scan else ''}"))
+            self.stdout.write(plan + "\n")
+
+    def is_sequential_scan(self, plan):
+        if connection.vendor == "postgresql":
+            return "Seq Scan" in plan
+        # SQLite: "SCAN table" is a full scan, "SCAN table USING INDEX" / "SEARCH" are not
+        return any("SCAN" in line and "USING" not in line for line in plan.splitlines())
+
+    def seed(self, count, batch_size=5000):
+        categories = [
+            ServiceCategory.objects.get_or_create(
+                name=f"Benchmark Category {i}", defaults={"description": "Benchmark data"}
+            )[0]
+            for i in range(20)
+        ]
+        for start in range(0, count, batch_size):
+            batch = []
+            for i in range(start, min(start + batch_size, count)):
+                price = Decimal(1000 + i % 50000)
+                batch.append(Product(
+                    category=categories[i % len(categories)],
+                    name=f"Benchmark product {i}",
+                    short_description="Benchmark data",
+                    unit_price=price,
+                    effective_price=price,
+                    published=i % 10 != 0,
+                ))
+            Product.objects.bulk_create(allocate_slugs(batch))
+            self.stdout.write(f"Seeded {min(start + batch_size, count)}/{count} products")
+        recompute_product_counts(ServiceCategory.objects.filter(pk__in=[category.pk for category in categories]))
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from products.images import generate_variants
+from products.models import ProductMedia
+
+
+class Command(BaseCommand):
+    help = "Build thumbnail/medium/large WebP and JPEG variants for product images that lack them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild variants for every image")
+
+    def handle(self, *args, **options):
+        media = ProductMedia.objects.exclude(image="").exclude(image__isnull=True)
+        built = failed = 0
+        for item in media.only("id", "image", "variants").iterator():
+            if not options["all"] and (item.variants or {}).get("source") == item.image.name:
+                continue
+            if generate_variants(item.pk) is None:
+                failed += 1
+            else:
+                built += 1
+        self.stdout.write(self.style.SUCCESS(f"Built variants for {built} image(s), {failed} failed"))
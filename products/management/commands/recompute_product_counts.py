@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from products.models import ServiceCategory
+from products.product_counts import recompute_product_counts
+
+
+class Command(BaseCommand):
+    help = "Rebuild ServiceCategory.product_count/published_product_count from products in bulk"
+
+    def handle(self, *args, **options):
+        updated = recompute_product_counts(ServiceCategory.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Repaired product counts of {updated} categories"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+from products.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    help = "Rebuild Product.rating_sum/rating_count from published feedback in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        updated = recompute_ratings(Product.objects.all(), batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Repaired rating aggregates of {updated} product(s)"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+from products.pricing import refresh_effective_prices, stale_price_candidates
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Product.effective_price. Schedule this every few minutes so "
+        "discounts take effect and expire at their start_date/end_date boundaries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every product instead of only discounted or out-of-sync ones",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        products = Product.objects.all() if options["all"] else stale_price_candidates()
+        updated = refresh_effective_prices(products, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Updated effective price of {updated} product(s)"))
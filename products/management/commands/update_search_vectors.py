@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+from products.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild Product.search_vector. Run after bulk imports or queryset.update() "
+        "calls that bypass Product.save (Postgres only)."
+    )
+
+    def handle(self, *args, **options):
+        updated = update_search_vectors(Product.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Updated search vectors of {updated} product(s)"))
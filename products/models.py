@@ -1,5 +1,5 @@
 import uuid
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils import timezone
 from decimal import Decimal
 from django.core.exceptions import ValidationError
@@ -7,6 +7,10 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings
 from django.utils.text import slugify
 from django.core.validators import FileExtensionValidator
+from django.contrib.postgres.search import SearchVectorField
+from .pricing import apply_discounts
+from .search import update_search_vectors
+from .slugs import next_free_slug
 
 
 class ServiceCategory(models.Model):
@@ -34,6 +38,9 @@ class ServiceCategory(models.Model):
     )
     
     is_active = models.BooleanField(default=True)
+    # Product counters, maintained by products.product_counts
+    product_count = models.PositiveIntegerField(default=0, editable=False)
+    published_product_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -45,6 +52,12 @@ class ServiceCategory(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        if kwargs.get("update_fields") is None and not self._state.adding:
+            # Counters are maintained by UPDATE queries; never write them back from a stale instance
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ("product_count", "published_product_count")
+            ]
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -55,11 +68,13 @@ class Product(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     category = models.ForeignKey(ServiceCategory, on_delete=models.PROTECT, related_name="products")
     name = models.CharField(max_length=200, blank=False, null=False)
-    slug = models.SlugField(max_length=200, blank=True, null=True)
+    slug = models.SlugField(max_length=200, blank=True, null=True, unique=True)
     short_description = models.CharField(max_length=255, blank=False, null=False)
     detailed_description = models.TextField(max_length=2000, null=True, blank=True)
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)], blank=True, null=True)
     currency = models.CharField(max_length=3, default="RWF", blank=True, null=True)
+    # Unit price with every valid discount applied, maintained by products.pricing
+    effective_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, editable=False, db_index=True)
     
     length = models.DecimalField(max_digits=6, decimal_places=2, validators=[MinValueValidator(0)], blank=True, null=True)
     width = models.DecimalField(max_digits=6, decimal_places=2, validators=[MinValueValidator(0)], blank=True, null=True)
@@ -68,6 +83,11 @@ class Product(models.Model):
  
     published = models.BooleanField(default=False)
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True)
+    # Published feedback aggregates, maintained by products.ratings
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    # Weighted tsvector over name/descriptions, GIN-indexed on Postgres (see products.search)
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -75,7 +95,24 @@ class Product(models.Model):
     available_colors = models.CharField(max_length=200, blank=True)
     available_colors = models.CharField(max_length=200, blank=True)
     available_materials = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        indexes = [
+            # Storefront listing: published products, newest first (ties broken by id)
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(published=True), name='product_pub_recent_idx'),
+            models.Index(fields=['category', '-created_at'], condition=models.Q(published=True), name='product_pub_cat_recent_idx'),
+            models.Index(fields=['effective_price'], condition=models.Q(published=True), name='product_pub_price_idx'),
+            models.Index(fields=['name'], condition=models.Q(published=True), name='product_pub_name_idx'),
+            # Staff listing over every product
+            models.Index(fields=['-created_at', '-id'], name='product_recent_idx'),
+        ]
     
+    @property
+    def average_rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
     @property
     def product_volume(self):
         if self.length or self.width or self.height :
@@ -83,35 +120,49 @@ class Product(models.Model):
         else :
             return 0
 
-    def save(self, *args, **kwargs):
-        # Auto-generate unique slug
-        if not self.slug:
-            base_slug = slugify(self.name) or str(uuid.uuid4())[:8]
-            slug = base_slug
-            counter = 1
-            while Product.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+    SLUG_SAVE_ATTEMPTS = 5
 
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return self._save(*args, **kwargs)
+
+        # Auto-generate unique slug: one lookup for the next free suffix, and the
+        # unique constraint settles races with concurrent creates
+        for attempt in range(self.SLUG_SAVE_ATTEMPTS):
+            self.slug = next_free_slug(Product, self.name, exclude_pk=None if self._state.adding else self.pk)
+            try:
+                with transaction.atomic(using=kwargs.get("using")):
+                    return self._save(*args, **kwargs)
+            except IntegrityError:
+                slug_taken = Product.objects.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                if not slug_taken or attempt == self.SLUG_SAVE_ATTEMPTS - 1:
+                    self.slug = None
+                    raise
+
+    def _save(self, *args, **kwargs):
         # Auto-calculate volume
         if self.length and self.width and self.height:
             self.product_volume = self.length * self.width * self.height
 
+        # Keep the stored price in step with unit_price edits
+        self.effective_price = self.get_final_price()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "unit_price" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "effective_price"}
+        elif update_fields is None and not self._state.adding:
+            # Aggregates and the search vector are maintained by UPDATE queries; never write them back from a stale instance
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ("rating_sum", "rating_count", "search_vector")
+            ]
+
         super().save(*args, **kwargs)
+        update_search_vectors(Product.objects.using(self._state.db).filter(pk=self.pk))
 
     def get_final_price(self):
-        price = self.unit_price
-
-        for pd in self.product_discounts.select_related("discount"):
-            discount = pd.discount
-            if pd.is_valid and discount.is_valid():
-                if discount.discount_type == Discount.PERCENTAGE:
-                    price -= price * (discount.discount_value / Decimal("100"))
-                elif discount.discount_type == Discount.FIXED:
-                    price -= discount.discount_value
-
-        return max(price, Decimal("0.00"))
+        if self._state.adding:
+            return apply_discounts(self.unit_price, [])
+        return apply_discounts(self.unit_price, self.product_discounts.select_related("discount"))
 
     def __str__(self):
         return self.name
@@ -155,11 +206,16 @@ class ProductMedia(models.Model):
     alt_text = models.CharField(max_length=200, blank=True)
     display_order = models.PositiveIntegerField(default=0)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # Resized WebP/JPEG derivatives of `image`, written by products.images
+    variants = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ["display_order"]
         verbose_name = "Product Media"
         verbose_name_plural = "Product Media"
+        indexes = [
+            models.Index(fields=['product', 'display_order'], name='media_product_order_idx'),
+        ]
 
     def clean(self):
         if not any([self.image, self.video_file, self.video_url, self.model_3d]):
@@ -185,6 +241,15 @@ class Feedback(models.Model):
     published = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Feedback"
+        verbose_name_plural = "Feedback"
+        indexes = [
+            models.Index(fields=['product', '-created_at'], condition=models.Q(published=True), name='feedback_pub_product_idx'),
+            models.Index(fields=['-created_at'], condition=models.Q(published=True), name='feedback_pub_recent_idx'),
+        ]
+
     def __str__(self):
         return f"{self.client_name} - {self.product.name}"
 
@@ -237,10 +302,6 @@ class ProductDiscount(models.Model):
 
     def __str__(self):
         return f"{self.product.name} - {self.discount.name}"
-    class Meta:
-        ordering = ['-created_at']
-        verbose_name = "Feedback"
-        verbose_name_plural = "Feedback"
 
 #customer request
 class CustomRequest(models.Model):
@@ -294,6 +355,10 @@ class CustomRequest(models.Model):
         ordering = ['-created_at']
         verbose_name = "Custom Request"
         verbose_name_plural = "Custom Requests"
+        indexes = [
+            models.Index(fields=['-created_at'], name='request_recent_idx'),
+            models.Index(fields=['status', '-created_at'], name='request_status_recent_idx'),
+        ]
 
     def __str__(self):
         return f"{self.client_name} - {self.title}"
@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+from django.db.models import F, Prefetch, Q
+from django.utils import timezone
+
+from .cache import bump_version
+
+
+CENT = Decimal("0.01")
+
+
+def apply_discounts(unit_price, product_discounts, now=None):
+    """
+    Stack every currently valid discount on top of `unit_price`.
+    This is the single source of truth for a product's final price.
+    """
+    from .models import Discount
+
+    if unit_price is None:
+        return None
+
+    now = now or timezone.now()
+    price = Decimal(str(unit_price))
+    for pd in product_discounts:
+        discount = pd.discount
+        if not pd.is_valid or not discount.is_active:
+            continue
+        if not (discount.start_date <= now <= discount.end_date):
+            continue
+        if discount.discount_type == Discount.PERCENTAGE:
+            price -= price * (discount.discount_value / Decimal("100"))
+        elif discount.discount_type == Discount.FIXED:
+            price -= discount.discount_value
+
+    return max(price, Decimal("0.00")).quantize(CENT)
+
+
+def refresh_effective_prices(products, batch_size=500):
+    """
+    Recompute and store `effective_price` for every product in `products`.
+    Only rows whose price actually changed are written; returns how many were.
+    """
+    from .models import Product, ProductDiscount
+
+    now = timezone.now()
+    product_ids = list(products.values_list("id", flat=True))
+    updated = 0
+
+    for start in range(0, len(product_ids), batch_size):
+        batch = Product.objects.filter(id__in=product_ids[start:start + batch_size]).prefetch_related(
+            Prefetch("product_discounts", queryset=ProductDiscount.objects.select_related("discount"))
+        )
+        changed = []
+        for product in batch:
+            price = apply_discounts(product.unit_price, product.product_discounts.all(), now)
+            if price != product.effective_price:
+                product.effective_price = price
+                product.updated_at = now
+                changed.append(product)
+        if changed:
+            Product.objects.bulk_update(changed, ["effective_price", "updated_at"])
+            updated += len(changed)
+
+    if updated:
+        bump_version("product")
+    return updated
+
+
+def stale_price_candidates():
+    """
+    Products whose stored price may be out of date: anything with a discount
+    attached, or whose effective price no longer mirrors its unit price.
+    """
+    from .models import Product
+
+    return Product.objects.filter(
+        Q(product_discounts__isnull=False)
+        | Q(effective_price__isnull=True, unit_price__isnull=False)
+        | ~Q(effective_price=F("unit_price"))
+    ).distinct()
@@ -0,0 +1,47 @@
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .cache import bump_version
+
+
+def product_contribution(product):
+    """(total, published) a product adds to its category's counters"""
+    return 1, 1 if product.published else 0
+
+
+def apply_count_delta(category_id, total_delta, published_delta):
+    """Adjust the stored counters atomically in a single UPDATE"""
+    from .models import ServiceCategory
+
+    if not total_delta and not published_delta:
+        return
+    ServiceCategory.objects.filter(pk=category_id).update(
+        product_count=F("product_count") + total_delta,
+        published_product_count=F("published_product_count") + published_delta,
+        updated_at=timezone.now(),
+    )
+
+
+def recompute_product_counts(categories):
+    """
+    Rebuild product_count/published_product_count for every category in
+    `categories` with one grouped query. Only rows that drifted are written;
+    returns how many were.
+    """
+    from .models import ServiceCategory
+
+    now = timezone.now()
+    changed = []
+    for category in categories.annotate(
+        total=Count("products"),
+        published=Count("products", filter=Q(products__published=True)),
+    ).only("id", "product_count", "published_product_count"):
+        if (category.product_count, category.published_product_count) != (category.total, category.published):
+            category.product_count = category.total
+            category.published_product_count = category.published
+            category.updated_at = now
+            changed.append(category)
+    if changed:
+        ServiceCategory.objects.bulk_update(changed, ["product_count", "published_product_count", "updated_at"])
+        bump_version("servicecategory")
+    return len(changed)
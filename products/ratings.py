@@ -0,0 +1,57 @@
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .cache import bump_version
+
+
+def rating_contribution(feedback):
+    """(sum, count) a feedback row adds to its product's rating; only published feedback counts"""
+    if feedback.published:
+        return feedback.rating, 1
+    return 0, 0
+
+
+def apply_rating_delta(product_id, sum_delta, count_delta):
+    """Adjust the stored aggregates atomically in a single UPDATE"""
+    from .models import Product
+
+    if not sum_delta and not count_delta:
+        return
+    Product.objects.filter(pk=product_id).update(
+        rating_sum=F("rating_sum") + sum_delta,
+        rating_count=F("rating_count") + count_delta,
+        updated_at=timezone.now(),
+    )
+
+
+def recompute_ratings(products, batch_size=500):
+    """
+    Rebuild rating_sum/rating_count from published feedback for every product
+    in `products`. Only rows that drifted are written; returns how many were.
+    """
+    from .models import Product
+
+    now = timezone.now()
+    product_ids = list(products.values_list("id", flat=True))
+    updated = 0
+
+    for start in range(0, len(product_ids), batch_size):
+        batch = Product.objects.filter(id__in=product_ids[start:start + batch_size]).annotate(
+            published_sum=Sum("feedbacks__rating", filter=Q(feedbacks__published=True)),
+            published_count=Count("feedbacks", filter=Q(feedbacks__published=True)),
+        ).only("id", "rating_sum", "rating_count")
+        changed = []
+        for product in batch:
+            rating_sum = product.published_sum or 0
+            if (product.rating_sum, product.rating_count) != (rating_sum, product.published_count):
+                product.rating_sum = rating_sum
+                product.rating_count = product.published_count
+                product.updated_at = now
+                changed.append(product)
+        if changed:
+            Product.objects.bulk_update(changed, ["rating_sum", "rating_count", "updated_at"])
+            updated += len(changed)
+
+    if updated:
+        bump_version("product")
+    return updated
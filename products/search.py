@@ -0,0 +1,68 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F
+
+
+# 'simple' keeps product names (often not English) intact instead of stemming them
+SEARCH_CONFIG = 'simple'
+SEARCH_INDEX_NAME = 'products_product_search_gin'
+
+PRODUCT_SEARCH_VECTOR = (
+    SearchVector('name', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('short_description', weight='B', config=SEARCH_CONFIG)
+    + SearchVector('detailed_description', weight='C', config=SEARCH_CONFIG)
+)
+
+
+def supports_full_text(using):
+    return connections[using].vendor == 'postgresql'
+
+
+def update_search_vectors(queryset):
+    """Rebuild the stored tsvector for every row in `queryset` with a single UPDATE"""
+    if not supports_full_text(queryset.db):
+        return 0
+    return queryset.update(search_vector=PRODUCT_SEARCH_VECTOR)
+
+
+def build_prefix_query(terms):
+    """
+    Turn free text into a raw tsquery where every word is a prefix match,
+    e.g. "wood cha" -> "wood:* & cha:*". Returns None when nothing is searchable.
+    """
+    words = re.findall(r'\w+', terms.lower())
+    if not words:
+        return None
+    return ' & '.join(f'{word}:*' for word in words)
+
+
+def full_text_search(queryset, terms):
+    """Filter `queryset` to matches of `terms` and annotate each row with `search_rank`"""
+    raw_query = build_prefix_query(terms)
+    if raw_query is None:
+        return queryset
+    query = SearchQuery(raw_query, search_type='raw', config=SEARCH_CONFIG)
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    )
+
+
+def ensure_search_index(sender, using='default', **kwargs):
+    """
+    post_migrate hook creating the GIN index on Postgres. It lives outside the
+    model Meta so SQLite test databases can still be created from the models.
+    Also fills the vector of rows that predate the column (or were written by
+    raw SQL), since a NULL vector never matches a search.
+    """
+    if not supports_full_text(using):
+        return
+    from .models import Product
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {SEARCH_INDEX_NAME} '
+            f'ON {Product._meta.db_table} USING GIN (search_vector)'
+        )
+    update_search_vectors(Product.objects.using(using).filter(search_vector__isnull=True))
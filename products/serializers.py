@@ -1,10 +1,11 @@
 from rest_framework import serializers
+from utils.fieldsets import SparseFieldsetMixin
+from .images import thumbnail_url, variant_urls
 from .models import CustomRequest, ServiceCategory, Product, ProductMedia, Feedback, Wishlist, WishlistItem, Discount, ProductDiscount
 
 
 
 class ServiceCategorySerializer(serializers.ModelSerializer):
-    product_count = serializers.SerializerMethodField()
    
     class Meta:
         model = ServiceCategory
@@ -19,15 +20,18 @@ class ServiceCategorySerializer(serializers.ModelSerializer):
             'is_active', 
             'created_at', 
             'updated_at', 
-            'product_count'
+            'product_count',
+            'published_product_count',
         ]
-        read_only_fields = ["id", "slug", "created_at", "updated_at", "product_count"]
-    
-    def get_product_count(self, obj) -> int:
-        return obj.products.count()
+        read_only_fields = ["id", "slug", "created_at", "updated_at", "product_count", "published_product_count"]
+
 
+class ProductMediaSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+    expandable_fields = {
+        'product': lambda: ProductListSerializer(read_only=True),
+    }
 
-class ProductMediaSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductMedia
         fields = [
@@ -35,19 +39,26 @@ class ProductMediaSerializer(serializers.ModelSerializer):
             "product",
             "model_3d",
             "image",
+            "srcset",
             "video_file",
             "video_url",
             "alt_text",
             "display_order",
             "uploaded_at",
         ]
-        read_only_fields = ["id", "uploaded_at"]
+        read_only_fields = ["id", "uploaded_at", "srcset"]
 
+    def get_srcset(self, obj) -> dict:
+        return variant_urls(obj) if obj.image else None
 
-class ProductSerializer(serializers.ModelSerializer):
+
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     media = ProductMediaSerializer(many=True, read_only=True)
     average_rating = serializers.FloatField(read_only=True)
-    final_price = serializers.SerializerMethodField()
+    final_price = serializers.DecimalField(source='effective_price', max_digits=10, decimal_places=2, read_only=True)
+    expandable_fields = {
+        'category': lambda: ServiceCategorySerializer(read_only=True),
+    }
     
     class Meta:
         model = Product
@@ -75,6 +86,7 @@ class ProductSerializer(serializers.ModelSerializer):
             "final_price",
             "media",
             "average_rating",
+            "rating_count",
         ]
         read_only_fields = [
             "id",
@@ -84,6 +96,7 @@ class ProductSerializer(serializers.ModelSerializer):
             "updated_at",
             "final_price",
             "average_rating",
+            "rating_count",
         ]
 
     def validate(self, data):
@@ -109,26 +122,14 @@ class ProductSerializer(serializers.ModelSerializer):
                     )        
         return data
     
-    def get_final_price(self, obj):
-        """
-        Calculate final price with discount if available.
-        """
-        # Try to get the active discount for the product
-        active_discounts = obj.product_discounts.filter(is_valid=True)
-        if active_discounts.exists():
-            discount = active_discounts.first().discount
-            if discount.discount_type == 'percentage':
-                return obj.unit_price * (1 - discount.discount_value / 100)
-            elif discount.discount_type == 'fixed':
-                return max(obj.unit_price - discount.discount_value, 0)
-        # No discount
-        return obj.unit_price
-
 
-class FeedbackSerializer(serializers.ModelSerializer):
+class FeedbackSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = serializers.UUIDField(source='user.id', read_only=True)
     product_name = serializers.ReadOnlyField(source='product.name')
     user_name = serializers.ReadOnlyField(source='user.full_name')
+    expandable_fields = {
+        'product': lambda: ProductListSerializer(read_only=True),
+    }
 
     class Meta:
         model = Feedback
@@ -145,23 +146,37 @@ class FeedbackSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'published', 'created_at','user']
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """serializer for product lists"""
     category_name = serializers.CharField(source='category.name', read_only=True)
     average_rating = serializers.FloatField(read_only=True)
     thumbnail = serializers.SerializerMethodField()
-    final_price = serializers.SerializerMethodField()
+    thumbnail_srcset = serializers.SerializerMethodField()
+    final_price = serializers.DecimalField(source='effective_price', max_digits=10, decimal_places=2, read_only=True)
+    expandable_fields = {
+        'category': lambda: ServiceCategorySerializer(read_only=True),
+        'media': lambda: ProductMediaSerializer(many=True, read_only=True),
+    }
     class Meta:
         model = Product
         fields = ['id', 'name', 'short_description', 'unit_price',
                   'currency', 'published', 'category_name',
-                  'average_rating', 'thumbnail', 'final_price']
+                  'average_rating', 'thumbnail', 'thumbnail_srcset', 'final_price']
  
+    def get_first_image(self, obj):
+        # `image_media` is prefetched by ProductViewSet for list requests
+        image_media = getattr(obj, 'image_media', None)
+        if image_media is not None:
+            return image_media[0] if image_media else None
+        # .all() rather than .first() so a plain 'media' prefetch (?expand=media) is used
+        return next((media for media in obj.media.all() if media.image), None)
+
     def get_thumbnail(self, obj) -> str:
-        first_media = obj.media.first()
-        if first_media and first_media.image:
-            return first_media.image.url
-        return None
+        return thumbnail_url(self.get_first_image(obj))
+
+    def get_thumbnail_srcset(self, obj) -> dict:
+        first_image = self.get_first_image(obj)
+        return variant_urls(first_image) if first_image else None
 
 class CustomRequestSerializer(serializers.ModelSerializer):
     service_category = serializers.PrimaryKeyRelatedField(
@@ -206,11 +221,14 @@ class CustomRequestSerializer(serializers.ModelSerializer):
         return instance
 
 
-class WishlistItemSerializer(serializers.ModelSerializer):
+class WishlistItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     product_name = serializers.ReadOnlyField(source='product.name')
     product_price = serializers.ReadOnlyField(source='product.unit_price')
     product_slug = serializers.ReadOnlyField(source='product.slug')
     product_thumbnail = serializers.SerializerMethodField()
+    expandable_fields = {
+        'product': lambda: ProductListSerializer(read_only=True),
+    }
     
     class Meta:
         model = WishlistItem
@@ -222,13 +240,15 @@ class WishlistItemSerializer(serializers.ModelSerializer):
     
    
     def get_product_thumbnail(self, obj) -> str:
-        first_media = obj.product.media.first()
+        # .all() uses the 'product__media' prefetch; .first() would query per item
+        media = obj.product.media.all()
+        first_media = media[0] if media else None
         if first_media and first_media.image:
-            return first_media.image.url
+            return thumbnail_url(first_media)
         return None
 
 
-class WishlistSerializer(serializers.ModelSerializer):
+class WishlistSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = WishlistItemSerializer(many=True, read_only=True)
     item_count = serializers.IntegerField(read_only=True)
     user_name = serializers.ReadOnlyField(source='user.full_name')
@@ -240,19 +260,6 @@ class WishlistSerializer(serializers.ModelSerializer):
             'items', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']    
-    def get_final_price(self, obj):
-        """
-        Calculate final price with discount if available.
-        """
-        active_discounts = obj.product_discounts.filter(is_valid=True)
-        if active_discounts.exists():
-            discount = active_discounts.first().discount
-            if discount.discount_type == 'percentage':
-                return obj.unit_price * (1 - discount.discount_value / 100)
-            elif discount.discount_type == 'fixed':
-                return max(obj.unit_price - discount.discount_value, 0)
-        # No discount
-        return obj.unit_price
 
 
 class DiscountSerializer(serializers.ModelSerializer):
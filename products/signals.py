@@ -0,0 +1,130 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from products.cache import bump_version
+from products.images import schedule_variants
+from products.models import ServiceCategory, Product, ProductMedia, Feedback, Discount, ProductDiscount
+from products.pricing import refresh_effective_prices
+from products.product_counts import apply_count_delta, product_contribution
+from products.ratings import rating_contribution, apply_rating_delta
+
+
+@receiver(post_save, sender=Discount)
+def discount_changed(sender, instance, **kwargs):
+    """Re-price every product the discount is attached to"""
+    refresh_effective_prices(Product.objects.filter(product_discounts__discount=instance))
+
+
+@receiver(post_save, sender=ProductDiscount)
+@receiver(post_delete, sender=ProductDiscount)
+def product_discount_changed(sender, instance, **kwargs):
+    """Re-price the product when a discount is attached, detached or toggled"""
+    refresh_effective_prices(Product.objects.filter(pk=instance.product_id))
+
+
+@receiver(pre_save, sender=Feedback)
+def remember_feedback_contribution(sender, instance, **kwargs):
+    """Capture what the row contributed before this save so post_save can apply the delta"""
+    instance._previous_rating = None
+    if instance._state.adding:
+        return
+    previous = Feedback.objects.filter(pk=instance.pk).values("product_id", "rating", "published").first()
+    if previous:
+        instance._previous_rating = previous
+
+
+@receiver(post_save, sender=Feedback)
+def feedback_saved(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_rating", None)
+    rating_sum, rating_count = rating_contribution(instance)
+
+    if previous and previous["published"]:
+        if previous["product_id"] != instance.product_id:
+            apply_rating_delta(previous["product_id"], -previous["rating"], -1)
+        else:
+            rating_sum -= previous["rating"]
+            rating_count -= 1
+
+    apply_rating_delta(instance.product_id, rating_sum, rating_count)
+
+
+@receiver(post_delete, sender=Feedback)
+def feedback_deleted(sender, instance, **kwargs):
+    rating_sum, rating_count = rating_contribution(instance)
+    apply_rating_delta(instance.product_id, -rating_sum, -rating_count)
+
+
+@receiver(pre_save, sender=Product)
+def remember_product_contribution(sender, instance, **kwargs):
+    """Capture the category and published flag before this save so post_save can apply the delta"""
+    instance._previous_category = None
+    if instance._state.adding:
+        return
+    previous = Product.objects.filter(pk=instance.pk).values("category_id", "published").first()
+    if previous:
+        instance._previous_category = previous
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, **kwargs):
+    """Keep the category product counters in step with creates, moves and publish toggles"""
+    previous = getattr(instance, "_previous_category", None)
+    total, published = product_contribution(instance)
+
+    if previous:
+        if previous["category_id"] != instance.category_id:
+            apply_count_delta(previous["category_id"], -1, -int(previous["published"]))
+        else:
+            total -= 1
+            published -= int(previous["published"])
+
+    apply_count_delta(instance.category_id, total, published)
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    total, published = product_contribution(instance)
+    apply_count_delta(instance.category_id, -total, -published)
+
+
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductMedia)
+@receiver(post_delete, sender=ProductMedia)
+@receiver(post_save, sender=Feedback)
+@receiver(post_delete, sender=Feedback)
+@receiver(post_save, sender=Discount)
+@receiver(post_delete, sender=Discount)
+@receiver(post_save, sender=ProductDiscount)
+@receiver(post_delete, sender=ProductDiscount)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    """Cached catalog responses that depend on this model are stale now"""
+    bump_version(sender._meta.model_name)
+
+
+def touch(model, **lookup):
+    """Bump updated_at without firing signals so ETags/Last-Modified of the parent change"""
+    model.objects.filter(**lookup).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=ProductMedia)
+@receiver(post_delete, sender=ProductMedia)
+def touch_product_for_media(sender, instance, **kwargs):
+    touch(Product, pk=instance.product_id)
+
+
+@receiver(post_save, sender=ServiceCategory)
+def touch_products_for_category(sender, instance, created, **kwargs):
+    """Product payloads embed the category name"""
+    if not created:
+        touch(Product, category_id=instance.pk)
+
+
+@receiver(post_save, sender=ProductMedia)
+def build_image_variants(sender, instance, **kwargs):
+    """Resize new or replaced images off the request thread"""
+    if instance.image and (instance.variants or {}).get("source") != instance.image.name:
+        schedule_variants(instance)
@@ -0,0 +1,84 @@
+import uuid
+from collections import defaultdict
+
+from django.db.models import Q
+from django.utils.text import slugify
+
+
+SLUG_MAX_LENGTH = 200
+# Leave room for a "-<n>" suffix within the column
+BASE_MAX_LENGTH = SLUG_MAX_LENGTH - 10
+# Two OR terms per base; SQLite rejects expressions nested deeper than 1000
+LOOKUP_CHUNK = 200
+
+
+def base_slug(name):
+    return slugify(name)[:BASE_MAX_LENGTH].strip("-") or uuid.uuid4().hex[:8]
+
+
+def _taken_suffixes(model, bases, exclude_pk=None):
+    """
+    One query per chunk of bases: every existing slug equal to a base or shaped
+    like "<base>-<n>". Returns {base: set of taken suffixes}, where 0 is the bare base.
+    """
+    taken = defaultdict(set)
+    bases = list(bases)
+    for start in range(0, len(bases), LOOKUP_CHUNK):
+        chunk = bases[start:start + LOOKUP_CHUNK]
+        condition = Q()
+        for base in chunk:
+            condition |= Q(slug=base) | Q(slug__startswith=f"{base}-")
+        queryset = model._default_manager.filter(condition)
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        chunk_bases = set(chunk)
+        for slug in queryset.values_list("slug", flat=True):
+            if slug in chunk_bases:
+                taken[slug].add(0)
+                continue
+            head, _, tail = slug.rpartition("-")
+            if head in chunk_bases and tail.isdigit():
+                taken[head].add(int(tail))
+    return taken
+
+
+def _format(base, suffix):
+    return base if suffix == 0 else f"{base}-{suffix}"
+
+
+def next_free_slug(model, name, exclude_pk=None):
+    """The first free slug for `name`: "vase", then "vase-1", "vase-2", ... in a single query"""
+    base = base_slug(name)
+    taken = _taken_suffixes(model, [base], exclude_pk)[base]
+    if 0 not in taken:
+        return base
+    return _format(base, max(taken) + 1)
+
+
+def allocate_slugs(instances):
+    """
+    Assign unique slugs to unsaved instances before a bulk_create, including
+    names that collide with each other. Costs one query per 200 distinct names.
+    """
+    pending = [obj for obj in instances if not obj.slug]
+    if not pending:
+        return instances
+
+    model = type(pending[0])
+    by_base = defaultdict(list)
+    for obj in pending:
+        by_base[base_slug(obj.name)].append(obj)
+
+    taken = _taken_suffixes(model, by_base.keys())
+    # A suffixed slug of one base can equal another base ("vase-1" from "Vase" and "Vase 1")
+    assigned = {obj.slug for obj in instances if obj.slug}
+    for base, objs in by_base.items():
+        used = taken[base]
+        suffix = 0 if 0 not in used else max(used) + 1
+        for obj in objs:
+            while _format(base, suffix) in assigned:
+                suffix += 1
+            obj.slug = _format(base, suffix)
+            assigned.add(obj.slug)
+            suffix += 1
+    return instances
@@ -1,6 +1,18 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
+from PIL import Image
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
 from products.models import ServiceCategory, Product, ProductMedia, Feedback, CustomRequest
+from products.images import thumbnail_url, variant_urls
+from products.slugs import allocate_slugs
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -207,4 +219,220 @@ class CustomRequestModelTest(TestCase):
         self.assertEqual(self.request.status, 'PENDING')
     
     def test_custom_request_str(self):
-        self.assertEqual(str(self.request), 'Jane Doe - Custom Design Request')
\ No newline at end of file
+        self.assertEqual(str(self.request), 'Jane Doe - Custom Design Request')
+
+class ProductRatingAggregateTest(TestCase):
+
+    def setUp(self):
+        category = ServiceCategory.objects.create(
+            name='Test',
+            description='Test'
+        )
+        self.product = Product.objects.create(
+            category=category,
+            name='Test Product',
+            short_description='desc'
+        )
+
+    def create_feedback(self, rating, published=True):
+        return Feedback.objects.create(
+            product=self.product,
+            client_name='John Doe',
+            message='Nice',
+            rating=rating,
+            published=published
+        )
+
+    def test_only_published_feedback_is_counted(self):
+        self.create_feedback(5)
+        self.create_feedback(1, published=False)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 1)
+        self.assertEqual(self.product.average_rating, 5)
+
+    def test_toggle_and_delete_adjust_aggregates(self):
+        self.create_feedback(4)
+        feedback = self.create_feedback(2, published=False)
+
+        feedback.published = True
+        feedback.save()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_sum, self.product.rating_count), (6, 2))
+        self.assertEqual(self.product.average_rating, 3)
+
+        feedback.delete()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_sum, self.product.rating_count), (4, 1))
+
+    def test_product_save_does_not_clobber_aggregates(self):
+        stale = Product.objects.get(pk=self.product.pk)
+        self.create_feedback(5)
+        stale.published = True
+        stale.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 1)
+
+    def test_recompute_command_repairs_drift(self):
+        self.create_feedback(3)
+        Product.objects.filter(pk=self.product.pk).update(rating_sum=0, rating_count=7)
+
+        call_command('recompute_product_ratings', stdout=StringIO())
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_sum, self.product.rating_count), (3, 1))
+
+
+class CategoryProductCountTest(TestCase):
+
+    def setUp(self):
+        self.category = ServiceCategory.objects.create(name='Decor', description='Test')
+        self.other = ServiceCategory.objects.create(name='Garden', description='Test')
+
+    def create_product(self, published=False):
+        return Product.objects.create(
+            category=self.category, name='Test Product', short_description='desc', published=published
+        )
+
+    def counts(self, category):
+        category.refresh_from_db()
+        return category.product_count, category.published_product_count
+
+    def test_create_and_delete_adjust_counters(self):
+        self.create_product(published=True)
+        product = self.create_product()
+        self.assertEqual(self.counts(self.category), (2, 1))
+
+        product.delete()
+        self.assertEqual(self.counts(self.category), (1, 1))
+
+    def test_publish_toggle_and_category_change_adjust_counters(self):
+        product = self.create_product()
+        product.published = True
+        product.save()
+        self.assertEqual(self.counts(self.category), (1, 1))
+
+        product.category = self.other
+        product.save()
+        self.assertEqual(self.counts(self.category), (0, 0))
+        self.assertEqual(self.counts(self.other), (1, 1))
+
+    def test_category_save_does_not_clobber_counters(self):
+        stale = ServiceCategory.objects.get(pk=self.category.pk)
+        self.create_product(published=True)
+        stale.description = 'Edited'
+        stale.save()
+        self.assertEqual(self.counts(self.category), (1, 1))
+
+    def test_recompute_command_repairs_drift(self):
+        self.create_product(published=True)
+        ServiceCategory.objects.filter(pk=self.category.pk).update(product_count=9, published_product_count=0)
+
+        call_command('recompute_product_counts', stdout=StringIO())
+        self.assertEqual(self.counts(self.category), (1, 1))
+
+
+class ProductSlugAllocationTest(TestCase):
+
+    def setUp(self):
+        self.category = ServiceCategory.objects.create(
+            name='Test',
+            description='Test'
+        )
+
+    def create_product(self, name):
+        return Product.objects.create(category=self.category, name=name, short_description='desc')
+
+    def test_colliding_names_get_numbered_suffixes(self):
+        slugs = [self.create_product('Vase').slug for _ in range(3)]
+        self.assertEqual(slugs, ['vase', 'vase-1', 'vase-2'])
+
+    def test_slug_lookup_is_a_single_query(self):
+        for _ in range(5):
+            self.create_product('Vase')
+        with CaptureQueriesContext(connection) as ctx:
+            product = self.create_product('Vase')
+        slug_queries = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT') and '"slug"' in q['sql']]
+        self.assertEqual(len(slug_queries), 1)
+        self.assertEqual(product.slug, 'vase-5')
+
+    def test_unrelated_slugs_sharing_a_prefix_are_ignored(self):
+        self.create_product('Vase')
+        self.create_product('Vase Large')
+        self.assertEqual(self.create_product('Vase').slug, 'vase-1')
+
+    def test_retries_when_a_concurrent_create_takes_the_slug(self):
+        self.create_product('Vase')
+        with patch('products.models.next_free_slug', side_effect=['vase', 'vase-1']):
+            product = self.create_product('Vase')
+        self.assertEqual(product.slug, 'vase-1')
+
+    def test_allocate_slugs_for_bulk_import(self):
+        self.create_product('Vase')
+        products = [
+            Product(category=self.category, name=name, short_description='desc')
+            for name in ['Vase', 'Vase', 'Bowl', 'Bowl']
+        ]
+        Product.objects.bulk_create(allocate_slugs(products))
+        self.assertEqual([p.slug for p in products], ['vase-1', 'vase-2', 'bowl', 'bowl-1'])
+
+    def test_allocate_slugs_across_colliding_bases(self):
+        products = [
+            Product(category=self.category, name=name, short_description='desc')
+            for name in ['Vase', 'Vase', 'Vase 1']
+        ]
+        Product.objects.bulk_create(allocate_slugs(products))
+        slugs = [p.slug for p in products]
+        self.assertEqual(len(set(slugs)), 3)
+        self.assertEqual(slugs[:2], ['vase', 'vase-1'])
+
+
+@override_settings(IMAGE_VARIANTS_ASYNC=False)
+class ProductMediaVariantTest(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        category = ServiceCategory.objects.create(
+            name='Test',
+            description='Test'
+        )
+        self.product = Product.objects.create(
+            category=category,
+            name='Test Product',
+            short_description='desc'
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def upload(self, size=(2000, 1000)):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'teal').save(buffer, 'JPEG')
+        with self.captureOnCommitCallbacks(execute=True):
+            media = ProductMedia.objects.create(
+                product=self.product,
+                image=SimpleUploadedFile('vase.jpg', buffer.getvalue(), content_type='image/jpeg')
+            )
+        media.refresh_from_db()
+        return media
+
+    def test_variants_are_generated_on_upload(self):
+        media = self.upload()
+        self.assertEqual(media.variants['source'], media.image.name)
+        self.assertEqual(
+            [media.variants[size]['width'] for size in ('thumbnail', 'medium', 'large')],
+            [320, 800, 1600]
+        )
+        self.assertEqual(media.variants['thumbnail']['height'], 160)
+        with default_storage.open(media.variants['medium']['webp']) as f:
+            self.assertEqual(Image.open(f).format, 'WEBP')
+
+    def test_small_originals_are_not_upscaled(self):
+        media = self.upload(size=(500, 500))
+        self.assertEqual(media.variants['large']['width'], 500)
+
+    def test_thumbnail_url_prefers_derivative(self):
+        media = self.upload()
+        self.assertTrue(thumbnail_url(media).endswith('thumbnail.jpeg'))
+        self.assertEqual(set(variant_urls(media)), {'thumbnail', 'medium', 'large'})
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 
@@ -7,6 +8,9 @@ User = get_user_model()
 class TestSetup(APITestCase):
     
     def setUp(self):
+        # Cached catalog responses must not leak between tests
+        cache.clear()
+
         # Create staff user
         self.staff_user = User.objects.create_user(
             email='staff@test.com',
@@ -26,10 +30,10 @@ class TestSetup(APITestCase):
         )
         
         # API endpoints
-        self.category_url = '/products/categories/'
-        self.product_url = '/products/products/'
-        self.feedback_url = '/products/feedback/'
-        self.custom_request_url = '/products/custom-requests/'
+        self.category_url = '/api/v1/products/categories/'
+        self.product_url = '/api/v1/products/products/'
+        self.feedback_url = '/api/v1/products/feedback/'
+        self.custom_request_url = '/api/v1/products/custom-requests/'
         
         return super().setUp()
     
@@ -1,5 +1,17 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import status
-from products.models import ServiceCategory, Product, Feedback, CustomRequest
+from products.models import ServiceCategory, Product, ProductMedia, Feedback, CustomRequest, Discount, ProductDiscount, Wishlist, WishlistItem
+from products.search import build_prefix_query
+from products.views import ProductViewSet
+from utils.instrumentation import QueryBudgetExceeded
+from utils.pagination import CreatedAtCursorPagination
 from .test_setup import TestSetup
 
 
@@ -46,6 +58,21 @@ class ServiceCategoryViewTest(TestSetup):
         })
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['requires_dimensions'])
+        self.assertEqual(response.data['product_count'], 0)
+
+    def test_list_reports_total_and_published_product_counts(self):
+        decor = ServiceCategory.objects.create(name='Decor', description='Home decor')
+        ServiceCategory.objects.create(name='Empty', description='Nothing yet')
+        for i in range(3):
+            Product.objects.create(category=decor, name=f'Vase {i}', short_description='desc', published=i > 0)
+
+        response = self.client.get(self.category_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        counts = {
+            category['name']: (category['product_count'], category['published_product_count'])
+            for category in response.data['results']
+        }
+        self.assertEqual(counts, {'Decor': (3, 2), 'Empty': (0, 0)})
 
 
 class ProductViewTest(TestSetup):
@@ -332,4 +359,429 @@ class CustomRequestViewTest(TestSetup):
         
         self.client.force_authenticate(user=self.staff_user)       
         response = self.client.patch(url, {'status': 'INVALID_STATUS_NAME'})
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProductListQueryCountTest(TestSetup):
+
+    def setUp(self):
+        super().setUp()
+        self.category = ServiceCategory.objects.create(
+            name='Decor',
+            description='Home decor'
+        )
+        self.discount = Discount.objects.create(
+            name='10 Percent OFF',
+            discount_type=Discount.PERCENTAGE,
+            discount_value=Decimal('10'),
+            start_date=timezone.now() - timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=1),
+            is_active=True
+        )
+
+    def create_products(self, count):
+        for i in range(count):
+            product = Product.objects.create(
+                category=self.category,
+                name=f'Vase {i}',
+                short_description='desc',
+                unit_price=Decimal('1000'),
+                published=True
+            )
+            ProductMedia.objects.create(product=product, image=f'products/images/vase-{i}.jpg', display_order=1)
+            ProductMedia.objects.create(product=product, video_url='https://example.com/v.mp4', display_order=0)
+            ProductDiscount.objects.create(product=product, discount=self.discount)
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.product_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+
+    def test_list_query_count_is_constant(self):
+        """Query count does not grow with the number of products on the page"""
+        self.create_products(3)
+        small, _ = self.count_list_queries()
+
+        self.create_products(12)
+        large, response = self.count_list_queries()
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data['results']), 15)
+
+    def test_list_uses_prefetched_thumbnail_and_price(self):
+        self.create_products(1)
+        _, response = self.count_list_queries()
+        item = response.data['results'][0]
+        self.assertEqual(item['category_name'], 'Decor')
+        self.assertTrue(item['thumbnail'].endswith('products/images/vase-0.jpg'))
+        self.assertEqual(Decimal(item['final_price']), Decimal('900.00'))
+
+
+class ProductSearchTest(TestSetup):
+
+    def setUp(self):
+        super().setUp()
+        category = ServiceCategory.objects.create(
+            name='Decor',
+            description='Home decor'
+        )
+        Product.objects.create(category=category, name='Clay Vase', short_description='Hand made', published=True)
+        Product.objects.create(category=category, name='Wooden Chair', short_description='Oak chair', published=True)
+
+    def test_search_falls_back_to_contains_without_postgres(self):
+        response = self.client.get(self.product_url, {'search': 'vase'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['name'] for p in response.data['results']], ['Clay Vase'])
+
+    def test_explicit_contains_mode(self):
+        response = self.client.get(self.product_url, {'search': 'oak', 'search_mode': 'contains'})
+        self.assertEqual([p['name'] for p in response.data['results']], ['Wooden Chair'])
+
+    def test_prefix_query_building(self):
+        self.assertEqual(build_prefix_query('Wood  CHA!'), 'wood:* & cha:*')
+        self.assertIsNone(build_prefix_query(' !? '))
+
+
+class CursorPaginationTest(TestSetup):
+
+    def setUp(self):
+        super().setUp()
+        category = ServiceCategory.objects.create(
+            name='Decor',
+            description='Home decor'
+        )
+        for i in range(5):
+            Product.objects.create(category=category, name=f'Vase {i}', short_description='desc', published=True)
+
+    def test_cursor_mode_walks_every_product_without_count(self):
+        seen = []
+        url = self.product_url + '?pagination=cursor'
+        with patch.object(CreatedAtCursorPagination, 'page_size', 2):
+            while url:
+                with CaptureQueriesContext(connection) as ctx:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotIn('count', response.data)
+                self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+                seen.extend(p['name'] for p in response.data['results'])
+                url = response.data['next']
+
+        self.assertEqual(seen, [f'Vase {i}' for i in reversed(range(5))])
+
+    def test_page_number_mode_is_default(self):
+        response = self.client.get(self.product_url)
+        self.assertEqual(response.data['count'], 5)
+
+
+@override_settings(PRODUCTS_CACHE_ENABLED=True)
+class CatalogResponseCacheTest(TestSetup):
+
+    def setUp(self):
+        super().setUp()
+        self.category = ServiceCategory.objects.create(
+            name='Decor',
+            description='Home decor'
+        )
+        self.product = Product.objects.create(
+            category=self.category, name='Clay Vase', short_description='desc', published=True
+        )
+
+    def test_second_anonymous_request_is_served_from_cache(self):
+        first = self.client.get(self.product_url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        # The ETag comes from the cache version counters, so a hit never reaches the database
+        with self.assertNumQueries(0):
+            second = self.client.get(self.product_url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.product_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_deleting_a_product_changes_the_cached_list_etag(self):
+        etag = self.client.get(self.product_url)['ETag']
+        self.product.delete()
+        response = self.client.get(self.product_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 0)
+
+    def test_saving_a_product_invalidates_cached_list(self):
+        self.client.get(self.product_url)
+        self.product.name = 'Stone Vase'
+        self.product.save()
+
+        response = self.client.get(self.product_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['name'], 'Stone Vase')
+
+    def test_feedback_change_invalidates_product_detail(self):
+        url = f'{self.product_url}{self.product.id}/'
+        self.client.get(url)
+        Feedback.objects.create(product=self.product, client_name='Ann', message='Nice', rating=4, published=True)
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['rating_count'], 1)
+
+    @override_settings(ALLOWED_HOSTS=['api.example.com', 'shop.example.com'])
+    def test_cached_pages_keep_their_own_host_in_links(self):
+        for i in range(20):
+            Product.objects.create(category=self.category, name=f'Bowl {i}', short_description='desc', published=True)
+
+        api = self.client.get(self.product_url, HTTP_HOST='api.example.com')
+        shop = self.client.get(self.product_url, HTTP_HOST='shop.example.com')
+        self.assertEqual(shop['X-Cache'], 'MISS')
+        self.assertTrue(api.data['next'].startswith('http://api.example.com/'))
+        self.assertTrue(shop.data['next'].startswith('http://shop.example.com/'))
+
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.force_authenticate(user=self.staff_user)
+        self.client.get(self.product_url)
+        response = self.client.get(self.product_url)
+        self.assertFalse(response.has_header('X-Cache'))
+
+
+class ConditionalGetTest(TestSetup):
+
+    def setUp(self):
+        super().setUp()
+        self.category = ServiceCategory.objects.create(
+            name='Decor',
+            description='Home decor'
+        )
+        self.product = Product.objects.create(
+            category=self.category, name='Clay Vase', short_description='desc', published=True
+        )
+        self.detail_url = f'{self.product_url}{self.product.id}/'
+
+    def test_detail_answers_304_for_matching_etag(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_etag_changes_when_a_product_changes(self):
+        etag = self.client.get(self.product_url)['ETag']
+        self.assertEqual(
+            self.client.get(self.product_url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED
+        )
+
+        ProductMedia.objects.create(product=self.product, image='products/images/vase.jpg')
+        response = self.client.get(self.product_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_varies_with_format_and_viewer(self):
+        response = self.client.get(self.detail_url)
+        etag = response['ETag']
+        self.assertIn('Accept, Authorization', response['Vary'])
+
+        not_modified = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('Accept, Authorization', not_modified['Vary'])
+
+        html = self.client.get(self.detail_url, HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(html.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(html['ETag'], etag)
+
+        self.client.force_authenticate(user=self.customer_user)
+        signed_in = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(signed_in.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(signed_in['ETag'], etag)
+
+    def test_list_counts_rows_once_and_sends_no_last_modified(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.product_url)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(sum('COUNT(' in query['sql'] for query in captured), 1)
+        self.assertNotIn('Last-Modified', response)
+
+        # A delete lowers the count but not the newest timestamp, so If-Modified-Since alone never earns a 304
+        since = http_date((timezone.now() + timedelta(minutes=1)).timestamp())
+        response = self.client.get(self.product_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_category_list_etag_follows_product_count(self):
+        etag = self.client.get(self.category_url)['ETag']
+        Product.objects.create(category=self.category, name='Bowl', short_description='desc')
+        response = self.client.get(self.category_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_moving_a_product_changes_the_old_category_etag(self):
+        other = ServiceCategory.objects.create(name='Garden', description='Outdoor')
+        detail_url = f'{self.category_url}{self.category.id}/'
+        etag = self.client.get(detail_url)['ETag']
+
+        self.product.category = other
+        self.product.save()
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['product_count'], 0)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTest(TestSetup):
+    """Catalog reads stay within their declared query_budget however many rows they return"""
+
+    def setUp(self):
+        super().setUp()
+        self.category = ServiceCategory.objects.create(name='Decor', description='Home decor')
+        for i in range(6):
+            product = Product.objects.create(
+                category=self.category, name=f'Vase {i}', short_description='desc', published=True
+            )
+            ProductMedia.objects.create(product=product, image=f'products/images/vase-{i}.jpg', display_order=0)
+            Feedback.objects.create(product=product, client_name='Ann', message='Nice', rating=4, published=True)
+        self.product = product
+
+    def test_catalog_reads_within_budget(self):
+        feedback = Feedback.objects.first()
+        media = ProductMedia.objects.first()
+        for url in [
+            self.product_url,
+            f'{self.product_url}{self.product.id}/',
+            '/api/v1/products/media/',
+            f'/api/v1/products/media/{media.id}/',
+            '/api/v1/products/feedback/',
+            f'/api/v1/products/feedback/{feedback.id}/',
+            self.category_url,
+            f'{self.category_url}{self.category.id}/',
+        ]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+
+    def test_exceeding_budget_fails(self):
+        with patch.object(ProductViewSet, 'query_budget', {'list': 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(self.product_url)
+
+    @override_settings(PRODUCTS_CACHE_ENABLED=True)
+    def test_server_timing_header(self):
+        first = self.client.get(self.product_url)
+        self.assertIn('db;dur=', first['Server-Timing'])
+        self.assertIn('desc="3 queries"', first['Server-Timing'])
+        self.assertIn('desc="0 hits 1 misses"', first['Server-Timing'])
+
+        second = self.client.get(self.product_url)
+        self.assertIn('desc="1 hits 0 misses"', second['Server-Timing'])
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class SparseFieldsetTest(TestSetup):
+    """?fields= prunes serializer fields and the queries behind them; ?expand= adds nested objects"""
+
+    def setUp(self):
+        super().setUp()
+        self.category = ServiceCategory.objects.create(name='Decor', description='Home decor')
+        self.products = []
+        for i in range(3):
+            product = Product.objects.create(
+                category=self.category, name=f'Vase {i}', short_description='desc', published=True
+            )
+            ProductMedia.objects.create(product=product, image=f'products/images/vase-{i}.jpg', display_order=0)
+            Feedback.objects.create(product=product, client_name='Ann', message='Nice', rating=4, published=True)
+            self.products.append(product)
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(ctx.captured_queries)
+
+    def test_list_fields_prunes_payload_and_prefetches(self):
+        _, full_queries = self.get(self.product_url)
+        response, narrow_queries = self.get(self.product_url, {'fields': 'id,name'})
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+        # No media prefetch when neither thumbnail field is asked for
+        self.assertEqual(narrow_queries, full_queries - 1)
+
+        response, _ = self.get(self.product_url, {'fields': 'id,name,thumbnail,final_price'})
+        item = response.data['results'][0]
+        self.assertEqual(set(item), {'id', 'name', 'thumbnail', 'final_price'})
+        self.assertTrue(item['thumbnail'].endswith('.jpg'))
+
+    def test_list_expand_media_and_category(self):
+        response, queries = self.get(self.product_url, {'expand': 'media,category'})
+        _, default_queries = self.get(self.product_url)
+
+        item = response.data['results'][0]
+        self.assertEqual(item['category']['name'], 'Decor')
+        self.assertEqual(len(item['media']), 1)
+        self.assertTrue(item['thumbnail'].endswith('.jpg'))
+        self.assertEqual(queries, default_queries)
+
+    def test_detail_fields_skip_nested_media(self):
+        url = f'{self.product_url}{self.products[0].id}/'
+        _, full_queries = self.get(url)
+        response, narrow_queries = self.get(url, {'fields': 'id,name'})
+
+        self.assertEqual(set(response.data), {'id', 'name'})
+        self.assertEqual(narrow_queries, full_queries - 1)
+
+        response, _ = self.get(url, {'expand': 'category'})
+        self.assertEqual(response.data['category']['product_count'], 3)
+
+    def test_feedback_and_media_expand_product(self):
+        response, _ = self.get(self.feedback_url, {'expand': 'product', 'fields': 'id,rating'})
+        item = response.data['results'][0]
+        self.assertEqual(set(item), {'id', 'rating', 'product'})
+        self.assertTrue(item['product']['thumbnail'].endswith('.jpg'))
+
+        response, _ = self.get('/api/v1/products/media/', {'expand': 'product'})
+        self.assertEqual(response.data['results'][0]['product']['category_name'], 'Decor')
+
+    @override_settings(PRODUCTS_CACHE_ENABLED=True)
+    def test_cached_expanded_responses_follow_product_changes(self):
+        for url in ['/api/v1/products/media/', self.feedback_url]:
+            self.get(url, {'expand': 'product'})
+        self.category.name = 'Garden'
+        self.category.save()
+
+        for url in ['/api/v1/products/media/', self.feedback_url]:
+            response, _ = self.get(url, {'expand': 'product'})
+            self.assertEqual(response['X-Cache'], 'MISS', url)
+            self.assertEqual(response.data['results'][0]['product']['category_name'], 'Garden')
+
+    def test_wishlist_item_thumbnails_use_prefetch(self):
+        wishlist = Wishlist.objects.create(user=self.customer_user, product=self.products[0])
+        WishlistItem.objects.create(wishlist=wishlist, product=self.products[0])
+        self.client.force_authenticate(user=self.customer_user)
+        url = '/api/v1/products/wishlist-items/'
+
+        _, one_item = self.get(url)
+        for product in self.products[1:]:
+            WishlistItem.objects.create(wishlist=wishlist, product=product)
+        response, three_items = self.get(url)
+
+        self.assertEqual(one_item, three_items)
+        self.assertTrue(all(item['product_thumbnail'].endswith('.jpg') for item in response.data['results']))
+
+    def test_wishlist_list_and_my_wishlist(self):
+        wishlist = Wishlist.objects.create(user=self.customer_user, product=self.products[0])
+        for product in self.products:
+            WishlistItem.objects.create(wishlist=wishlist, product=product)
+        self.client.force_authenticate(user=self.customer_user)
+
+        response, _ = self.get('/api/v1/products/wishlist/')
+        self.assertEqual(response.data['results'][0]['item_count'], 3)
+        self.assertEqual(response.data['results'][0]['user_name'], 'Customer User')
+
+        response, _ = self.get('/api/v1/products/wishlist/my_wishlist/')
+        self.assertEqual(response.data['item_count'], 3)
+        self.assertEqual(len(response.data['items']), 3)
+
+    def test_writes_ignore_fields(self):
+        self.client.force_authenticate(user=self.staff_user)
+        response = self.client.post(f'{self.product_url}?fields=id', {
+            'category': self.category.id, 'name': 'Bowl', 'short_description': 'desc',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['name'], 'Bowl')
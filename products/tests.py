@@ -2,6 +2,8 @@ from django.test import TestCase
 from django.utils import timezone
 from decimal import Decimal
 from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
 
 from products.models import (
     ServiceCategory,
@@ -91,3 +93,58 @@ class ProductPricingTest(TestCase):
 
         final_price = self.product.get_final_price()
         self.assertEqual(final_price, Decimal("0.00"))
+
+
+class EffectivePriceTest(TestCase):
+
+    def setUp(self):
+        self.category = ServiceCategory.objects.create(
+            name="Decor"
+        )
+
+        self.product = Product.objects.create(
+            category=self.category,
+            name="Vase",
+            short_description="Clay vase",
+            unit_price=Decimal("10000"),
+            published=True
+        )
+
+        self.discount = Discount.objects.create(
+            name="10 Percent OFF",
+            discount_type=Discount.PERCENTAGE,
+            discount_value=Decimal("10"),
+            start_date=timezone.now() - timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=1),
+            is_active=True
+        )
+
+    def test_effective_price_defaults_to_unit_price(self):
+        self.assertEqual(self.product.effective_price, Decimal("10000.00"))
+
+    def test_attaching_discount_updates_effective_price(self):
+        ProductDiscount.objects.create(product=self.product, discount=self.discount)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, Decimal("9000.00"))
+
+    def test_discount_edit_and_detach_update_effective_price(self):
+        product_discount = ProductDiscount.objects.create(product=self.product, discount=self.discount)
+
+        self.discount.discount_type = Discount.FIXED
+        self.discount.discount_value = Decimal("2500")
+        self.discount.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, Decimal("7500.00"))
+
+        product_discount.delete()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, Decimal("10000.00"))
+
+    def test_command_expires_discount_at_end_date(self):
+        ProductDiscount.objects.create(product=self.product, discount=self.discount)
+        # Move the end date into the past without going through save() signals
+        Discount.objects.filter(pk=self.discount.pk).update(end_date=timezone.now() - timedelta(minutes=1))
+
+        call_command("refresh_effective_prices", stdout=StringIO())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_price, Decimal("10000.00"))
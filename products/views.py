@@ -1,9 +1,14 @@
-from rest_framework import viewsets, permissions, filters
+from rest_framework import viewsets, permissions, filters, status
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Avg
+from django.db.models import Count, Prefetch
 from .models import ServiceCategory, Product, ProductMedia, Feedback, CustomRequest, Wishlist, WishlistItem, Discount, ProductDiscount
+from utils.fieldsets import FieldSelection
+from utils.pagination import SelectablePagination
+from .cache import CachedReadMixin
+from .conditional import ConditionalGetMixin
+from .filters import ProductSearchFilter, ProductOrderingFilter
 from .permissions import AnyoneCanCreateRequest, AnyoneCanCreateRequest, IsAdminOrStaffOrReadOnly, IsOwnerOnly, IsStaffOnly, CustomerCanCreateFeedback
 from .serializers import (
     CustomRequestSerializer,
@@ -20,21 +25,37 @@ from .serializers import (
 )
 
 
-class ServiceCategoryViewSet(viewsets.ModelViewSet):
+def image_media():
+    return ProductMedia.objects.exclude(image='').exclude(image__isnull=True).order_by('display_order')
+
+
+def with_expanded_product(qs):
+    """What a nested ProductListSerializer under `product` reads (?expand=product): one JOIN, one prefetch"""
+    return qs.select_related('product__category').prefetch_related(
+        Prefetch('product__media', queryset=image_media(), to_attr='image_media'),
+    )
+
+
+class ServiceCategoryViewSet(ConditionalGetMixin, CachedReadMixin, viewsets.ModelViewSet):
     queryset = ServiceCategory.objects.all()
     serializer_class = ServiceCategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_dependencies = ('servicecategory', 'product')
+    # ETag aggregate (its count feeds the paginator) + page; product counts are stored columns (utils.instrumentation)
+    query_budget = {'list': 2, 'retrieve': 2}
 
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.all().annotate(
-        average_rating=Avg("feedbacks__rating")
-    )
+class ProductViewSet(ConditionalGetMixin, CachedReadMixin, viewsets.ModelViewSet):
+    queryset = Product.objects.defer('search_vector')
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = SelectablePagination
+    cache_dependencies = ('product', 'productmedia', 'servicecategory', 'feedback', 'discount', 'productdiscount')
+    # ETag aggregate (its count feeds the paginator) + page + media prefetch (utils.instrumentation)
+    query_budget = {'list': 3, 'retrieve': 3}
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, ProductOrderingFilter]
     search_fields = ['name', 'short_description', 'detailed_description']
-    ordering_fields = ['unit_price', 'created_at', 'name']
+    ordering_fields = ['unit_price', 'effective_price', 'created_at', 'name']
     ordering = ['-created_at']
 
     def get_serializer_class(self):
@@ -54,12 +75,33 @@ class ProductViewSet(viewsets.ModelViewSet):
         if published is not None:
             qs = qs.filter(published=published.lower() == "true")
         if min_price:
-            qs = qs.filter(unit_price__gte=min_price)
+            qs = qs.filter(effective_price__gte=min_price)
         if max_price:
-            qs = qs.filter(unit_price__lte=max_price)
+            qs = qs.filter(effective_price__lte=max_price)
+
+        selection = FieldSelection(self.request)
+        if self.action == 'list':
+            qs = self.prefetch_list_relations(qs, selection)
+        elif selection.expands('category'):
+            qs = qs.select_related('category')
 
         return qs
 
+    def prefetch_list_relations(self, qs, selection):
+        """
+        Resolve everything ProductListSerializer reads in a fixed number of queries,
+        no matter how many products are on the page; fields left out by ?fields=
+        cost nothing.
+        """
+        if selection.includes('category_name') or selection.expands('category'):
+            qs = qs.select_related('category')
+        if selection.expands('media'):
+            # The thumbnail is picked from the full media list, so one prefetch serves both
+            qs = qs.prefetch_related('media')
+        elif selection.includes_any('thumbnail', 'thumbnail_srcset'):
+            qs = qs.prefetch_related(Prefetch('media', queryset=image_media(), to_attr='image_media'))
+        return qs
+
     @action(detail=True, methods=["post"])
     def publish(self, request, pk=None):
         product = self.get_object()
@@ -75,23 +117,32 @@ class ProductViewSet(viewsets.ModelViewSet):
         return Response({"status": "Product unpublished"})
     
   
-class ProductMediaViewSet(viewsets.ModelViewSet):
+class ProductMediaViewSet(CachedReadMixin, viewsets.ModelViewSet):
     queryset = ProductMedia.objects.all()
     serializer_class = ProductMediaSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    # ?expand=product embeds the product with its category name
+    cache_dependencies = ('productmedia', 'product', 'servicecategory')
+    query_budget = {'list': 2, 'retrieve': 1}
     
     def get_queryset(self):
         qs = super().get_queryset()
         product_id = self.request.query_params.get('product')
         if product_id:
             qs = qs.filter(product_id=product_id)
+        if FieldSelection(self.request).expands('product'):
+            qs = with_expanded_product(qs)
         return qs
 
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(CachedReadMixin, viewsets.ModelViewSet):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
     permission_classes = [CustomerCanCreateFeedback]
+    pagination_class = SelectablePagination
+    # ?expand=product embeds the product with its category name and thumbnail
+    cache_dependencies = ('feedback', 'product', 'productmedia', 'servicecategory')
+    query_budget = {'list': 2, 'retrieve': 1}
     authentication_classes = []
     
     def perform_create(self, serializer):
@@ -99,6 +150,11 @@ class FeedbackViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         qs = super().get_queryset()
+        selection = FieldSelection(self.request)
+        if selection.expands('product'):
+            qs = with_expanded_product(qs)
+        elif selection.includes('product_name'):
+            qs = qs.select_related('product')
         
         # Non-staff users only see published feedback
         if not self.request.user.is_staff:
@@ -125,6 +181,7 @@ class CustomRequestViewSet(viewsets.ModelViewSet):
     queryset = CustomRequest.objects.all()
     serializer_class = CustomRequestSerializer
     permission_classes = [AnyoneCanCreateRequest]
+    pagination_class = SelectablePagination
     
     
  
@@ -137,12 +194,25 @@ class WishlistViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsOwnerOnly]
     
     def get_queryset(self):
-        return Wishlist.objects.filter(user=self.request.user)
+        qs = Wishlist.objects.filter(user=self.request.user)
+        selection = FieldSelection(self.request)
+        if selection.includes('item_count'):
+            qs = qs.annotate(item_count=Count('items'))
+        if selection.includes('user_name'):
+            qs = qs.select_related('user')
+        if selection.includes('items'):
+            qs = qs.prefetch_related(
+                Prefetch('items', queryset=WishlistItem.objects.select_related('product')),
+                'items__product__media',
+            )
+        return qs
     
     @action(detail=False, methods=['get'])
     def my_wishlist(self, request):
         """Get or create user's wishlist"""
-        wishlist, created = Wishlist.objects.get_or_create(user=request.user)
+        wishlist = self.get_queryset().first()
+        if wishlist is None:
+            wishlist, created = Wishlist.objects.get_or_create(user=request.user)
         serializer = self.get_serializer(wishlist)
         return Response(serializer.data)
 
@@ -157,9 +227,18 @@ class WishlistItemViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # Get user's wishlist items
         wishlist = Wishlist.objects.filter(user=self.request.user).first()
-        if wishlist:
-            return WishlistItem.objects.filter(wishlist=wishlist)
-        return WishlistItem.objects.none()
+        if not wishlist:
+            return WishlistItem.objects.none()
+
+        qs = WishlistItem.objects.filter(wishlist=wishlist)
+        selection = FieldSelection(self.request)
+        if selection.expands('product'):
+            qs = with_expanded_product(qs)
+        elif selection.includes_any('product_name', 'product_price', 'product_slug', 'product_thumbnail'):
+            qs = qs.select_related('product')
+        if selection.includes('product_thumbnail'):
+            qs = qs.prefetch_related('product__media')
+        return qs
     
     def perform_create(self, serializer):
         # Get or create user's wishlist
@@ -222,16 +301,18 @@ class WishlistItemViewSet(viewsets.ModelViewSet):
         return Response({"message": "Wishlist is already empty"})
 
 
-class DiscountViewSet(viewsets.ModelViewSet):
+class DiscountViewSet(CachedReadMixin, viewsets.ModelViewSet):
     queryset = Discount.objects.all()
     serializer_class = DiscountSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_dependencies = ('discount',)
 
 
-class ProductDiscountViewSet(viewsets.ModelViewSet):
+class ProductDiscountViewSet(CachedReadMixin, viewsets.ModelViewSet):
     queryset = ProductDiscount.objects.all()
     serializer_class = ProductDiscountSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_dependencies = ('productdiscount', 'product', 'discount')
 
     def get_queryset(self):
         qs = super().get_queryset()
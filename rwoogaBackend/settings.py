@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 from datetime import timedelta
 from pathlib import Path
 import dj_database_url 
+from rwoogaBackend.database import apply_pool_options
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'accounts.User'
 
 MIDDLEWARE = [
+    'utils.instrumentation.RequestInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -72,16 +74,23 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'rwoogaBackend.wsgi.application'
+ASGI_APPLICATION = 'rwoogaBackend.asgi.application'
+# 'wsgi' or 'asgi'; also picks the gunicorn worker class (gunicorn.conf.py)
+SERVER_MODE = config('SERVER_MODE', default='wsgi')
+# Under ASGI every request runs its sync code on a fresh executor thread, so
+# persistent connections would pile up per thread instead of being reused;
+# add ?pool=true to DATABASE_URL for pooled connections in either mode
+DATABASE_CONN_MAX_AGE = 0 if SERVER_MODE == 'asgi' else 600
 
 # Database Configuration for production
 if config('DATABASE_URL', default=None):
     DATABASES = {
-        'default': dj_database_url.config(
+        'default': apply_pool_options(dj_database_url.config(
             default=config('DATABASE_URL'),
-            conn_max_age=600,  
+            conn_max_age=DATABASE_CONN_MAX_AGE,  
             conn_health_checks=True,  
             ssl_require=True,  
-        )
+        ))
     }
 else:
     # Fallback for local development
@@ -96,11 +105,57 @@ else:
             'OPTIONS': {
                  'sslmode': 'require',  
              },
-            'CONN_MAX_AGE': 600,  
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,  
         }
     }
 
+# Cache: Redis in production (REDIS_URL), per-process memory locally
+if config('REDIS_URL', default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Anonymous catalog responses (products app) served from the cache. On by default
+# only with a shared cache: invalidation bumps a version in the cache, and another
+# worker's LocMemCache would keep serving its stale copies until they expire.
+PRODUCTS_CACHE_ENABLED = config(
+    'PRODUCTS_CACHE_ENABLED',
+    default=CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache',
+    cast=bool,
+)
+PRODUCTS_CACHE_TIMEOUT = config('PRODUCTS_CACHE_TIMEOUT', default=300, cast=int)
+
 # Password validation
+# Password hashing. PASSWORD_HASHER picks the algorithm for new hashes; the others
+# stay listed so existing hashes still verify and are re-encoded on the next login.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='argon2')  # argon2 | scrypt | pbkdf2
+# Sized for gunicorn's 2 workers x 4 threads: 8 concurrent Argon2 hashes stay under ~160 MiB
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=19456, cast=int)  # KiB
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=1, cast=int)
+PASSWORD_SCRYPT_WORK_FACTOR = config('PASSWORD_SCRYPT_WORK_FACTOR', default=2 ** 15, cast=int)
+PASSWORD_SCRYPT_BLOCK_SIZE = config('PASSWORD_SCRYPT_BLOCK_SIZE', default=8, cast=int)
+PASSWORD_SCRYPT_PARALLELISM = config('PASSWORD_SCRYPT_PARALLELISM', default=1, cast=int)
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=1000000, cast=int)
+
+_PASSWORD_HASHERS = {
+    'argon2': 'accounts.hashers.TunedArgon2PasswordHasher',
+    'scrypt': 'accounts.hashers.TunedScryptPasswordHasher',
+    'pbkdf2': 'accounts.hashers.TunedPBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -150,7 +205,13 @@ INSTAGRAM_ICON_URL = config('INSTAGRAM_ICON_URL', default='')
 TWITTER_ICON_URL = config('TWITTER_ICON_URL', default='')
 TIKTOK_ICON_URL = config('TIKTOK_ICON_URL', default='')
 
+# Resize uploaded product images in a background thread (set False to build inline on commit)
+IMAGE_VARIANTS_ASYNC = config('IMAGE_VARIANTS_ASYNC', default=True, cast=bool)
+
 STORAGES = {   
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedStaticFilesStorage",
     },
@@ -173,17 +234,47 @@ EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER)
+# Seconds before a hung SMTP connect/send gives up, so sends never block a thread indefinitely
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=15, cast=int)
+
+# Email outbox (drained by `manage.py run_mail_worker`)
+# Set True when the Procfile `worker` process (or another run_mail_worker) is deployed.
+# Left False, the web process sends queued mail on a background thread after the request commits.
+MAIL_OUTBOX_WORKER = config('MAIL_OUTBOX_WORKER', default=False, cast=bool)
+MAIL_WORKER_CONCURRENCY = config('MAIL_WORKER_CONCURRENCY', default=2, cast=int)
+MAIL_WORKER_POLL_SECONDS = config('MAIL_WORKER_POLL_SECONDS', default=1.0, cast=float)
+MAIL_OUTBOX_BATCH_SIZE = config('MAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+MAIL_OUTBOX_MAX_ATTEMPTS = config('MAIL_OUTBOX_MAX_ATTEMPTS', default=6, cast=int)
+MAIL_OUTBOX_RETRY_BASE_SECONDS = config('MAIL_OUTBOX_RETRY_BASE_SECONDS', default=30, cast=int)
+MAIL_OUTBOX_RETRY_MAX_SECONDS = config('MAIL_OUTBOX_RETRY_MAX_SECONDS', default=3600, cast=int)
+MAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS = config('MAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS', default=600, cast=int)
+MAIL_OUTBOX_RETENTION_DAYS = config('MAIL_OUTBOX_RETENTION_DAYS', default=7, cast=int)
 # Site Configuration
 
 COMPANY_NAME = config('COMPANY_NAME', default='Rwooga')
 SUPPORT_EMAIL = config('SUPPORT_EMAIL', default='support@rwooga.com')
 VERIFICATION_CODE_EXPIRY_MINUTES = config('VERIFICATION_CODE_EXPIRY_MINUTES', default=10, cast=int)
+# 'database' (VerificationCode rows) or 'cache' (needs a shared cache such as REDIS_URL)
+VERIFICATION_CODE_STORE = config('VERIFICATION_CODE_STORE', default='database')
 
 
+# orjson-backed JSON rendering/parsing (utils.renderers, utils.parsers); both fall
+# back to DRF's stdlib implementation on their own when orjson isn't installed
+FAST_JSON = config('FAST_JSON', default=True, cast=bool)
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'utils.renderers.FastJSONRenderer' if FAST_JSON else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'utils.parsers.FastJSONParser' if FAST_JSON else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -196,15 +287,34 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Token buckets for the unauthenticated auth endpoints (accounts.throttling)
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('THROTTLE_LOGIN_IP', default='30/min'),
+        'login_email': config('THROTTLE_LOGIN_EMAIL', default='10/min'),
+        'register_ip': config('THROTTLE_REGISTER_IP', default='20/hour'),
+        'register_email': config('THROTTLE_REGISTER_EMAIL', default='5/hour'),
+        'verification_ip': config('THROTTLE_VERIFICATION_IP', default='20/hour'),
+        'verification_email': config('THROTTLE_VERIFICATION_EMAIL', default='5/hour'),
+        'code_ip': config('THROTTLE_CODE_IP', default='30/hour'),
+        'code_email': config('THROTTLE_CODE_EMAIL', default='5/hour'),
+    },
+    # Proxies in front of the app (Koyeb/Heroku router) whose X-Forwarded-For entry is trusted.
+    # Must match the deployment: 0 reads REMOTE_ADDR, and an empty value trusts whatever
+    # X-Forwarded-For the client sends, which lets anyone dodge the per-IP throttles.
+    'NUM_PROXIES': config('NUM_PROXIES', default='1', cast=lambda v: None if v in (None, '') else int(v)),
 }
 
+# Set to False only for load tests that need unthrottled logins (benchmark_logins)
+AUTH_THROTTLE_ENABLED = config('AUTH_THROTTLE_ENABLED', default=True, cast=bool)
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    # Login records last_login itself via User.record_login (coalesced)
+    'UPDATE_LAST_LOGIN': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -216,6 +326,18 @@ SIMPLE_JWT = {
     'JTI_CLAIM': 'jti',
 }
 
+# Logins within this many seconds of the recorded last_login don't write it again
+LAST_LOGIN_UPDATE_INTERVAL = config('LAST_LOGIN_UPDATE_INTERVAL', default=300, cast=int)
+
+# Per-request ORM/serializer/cache metrics (utils.instrumentation)
+REQUEST_METRICS_SERVER_TIMING = config('REQUEST_METRICS_SERVER_TIMING', default=True, cast=bool)
+REQUEST_METRICS_LOG = config('REQUEST_METRICS_LOG', default=True, cast=bool)
+# Raise instead of logging a warning when a view exceeds its query_budget (tests, CI)
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=False, cast=bool)
+
+# How long ClaimsJWTAuthentication trusts a cached is_active/role entry
+AUTH_USER_STATUS_CACHE_TIMEOUT = config('AUTH_USER_STATUS_CACHE_TIMEOUT', default=60, cast=int)
+
 # API Documentation Configuration
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Rwooga Backend API',
@@ -252,6 +374,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'utils': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
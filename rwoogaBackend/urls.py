@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from utils.views import DatabasePoolStatsView
 
 
 urlpatterns = [
@@ -8,6 +9,7 @@ urlpatterns = [
     path('', include('accounts.urls')), 
     path('api/v1/products/', include('products.urls')),
     path('api/v1/orders/', include('orders.urls')),
+    path('api/v1/system/db-pool/', DatabasePoolStatsView.as_view(), name='db-pool-stats'),
     # API Documentation
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
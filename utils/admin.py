@@ -1,3 +1,18 @@
 from django.contrib import admin
+from django.utils import timezone
+from .models import OutboundEmail
 
-# Register your models here.
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['id', 'recipient', 'subject', 'status', 'attempts', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['recipient', 'subject']
+    readonly_fields = ['created_at', 'sent_at', 'locked_at', 'attempts', 'last_error']
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        queryset.exclude(status=OutboundEmail.SENT).update(
+            status=OutboundEmail.PENDING, available_at=timezone.now(), attempts=0, locked_at=None
+        )
+    retry_now.short_description = "Retry selected emails now"
@@ -0,0 +1,18 @@
+from django.db import connections
+
+
+def pooled_aliases():
+    return [alias for alias in connections if connections.settings[alias].get('OPTIONS', {}).get('pool')]
+
+
+def pool_stats():
+    """
+    psycopg_pool counters for every pooled alias in this process: pool_size,
+    pool_available, requests_waiting, requests_num, requests_wait_ms, ... .
+    Empty when no alias is pooled.
+    """
+    stats = {}
+    for alias in pooled_aliases():
+        pool = connections[alias].pool
+        stats[alias] = pool.get_stats() if pool is not None else {}
+    return stats
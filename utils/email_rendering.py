@@ -0,0 +1,118 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.html import conditional_escape, strip_tags
+
+# Context key -> setting, shared by every transactional email
+BRANDING_SETTINGS = {
+    "company_name": "COMPANY_NAME",
+    "company_logo_url": "COMPANY_LOGO_URL",
+    "company_url": "COMPANY_URL",
+    "youtube": "YOUTUBE",
+    "instagram": "INSTAGRAM",
+    "twitter": "TWITTER",
+    "tiktok": "TIKTOK",
+    "linkedin": "LINKEDIN",
+    "youtube_icon_url": "YOUTUBE_ICON_URL",
+    "instagram_icon_url": "INSTAGRAM_ICON_URL",
+    "twitter_icon_url": "TWITTER_ICON_URL",
+    "tiktok_icon_url": "TIKTOK_ICON_URL",
+    "linkedin_icon_url": "LINKEDIN_ICON_URL",
+    "support_email": "SUPPORT_EMAIL",
+    "expiry_minutes": "VERIFICATION_CODE_EXPIRY_MINUTES",
+}
+
+# Unit separators survive autoescaping and strip_tags untouched
+PLACEHOLDER = "\x1f{}\x1f"
+PLACEHOLDER_RE = re.compile("\x1f(\\w+)\x1f")
+
+
+@lru_cache(maxsize=1)
+def _static_branding():
+    return {key: getattr(settings, name, "") for key, name in BRANDING_SETTINGS.items()}
+
+
+def branding_context():
+    """Static branding values, read from settings once per process"""
+    return {**_static_branding(), "current_year": timezone.now().year}
+
+
+class EmailSkeleton:
+    """
+    A template pre-rendered with the branding context and placeholders for the
+    per-message fields, plus its plain-text version. Rendering a message is a
+    join over precomputed fragments: no template engine, no HTML parsing.
+
+    Only valid for templates that print the per-message fields without
+    branching on them (true of everything in templates/emails).
+    """
+
+    def __init__(self, html, text):
+        self.html_parts = PLACEHOLDER_RE.split(html)
+        self.text_parts = PLACEHOLDER_RE.split(text)
+
+    @staticmethod
+    def _fill(parts, values):
+        # split() leaves literals at even indexes and field names at odd ones
+        return "".join(values[part] if i % 2 else part for i, part in enumerate(parts))
+
+    def render(self, values):
+        html_values = {key: str(conditional_escape(value)) for key, value in values.items()}
+        text_values = {key: str(value) for key, value in values.items()}
+        return self._fill(self.html_parts, html_values), self._fill(self.text_parts, text_values)
+
+
+@lru_cache(maxsize=None)
+def compiled_template(template_name):
+    return get_template(template_name)
+
+
+@lru_cache(maxsize=64)
+def _skeleton(template_name, fields, year):
+    context = {**_static_branding(), "current_year": year}
+    context.update({field: PLACEHOLDER.format(field) for field in fields})
+    html = compiled_template(template_name).render(context)
+    return EmailSkeleton(html, strip_tags(html))
+
+
+def get_skeleton(template_name, fields):
+    return _skeleton(template_name, tuple(sorted(fields)), timezone.now().year)
+
+
+def _message_values(context, branding):
+    # Callers may still pass branding keys; only the ones they override are per-message
+    return {key: value for key, value in context.items() if key not in branding or branding[key] != value}
+
+
+def render_email(template_name, context):
+    """Render one email. `context` only needs the per-message values. Returns (html, text)."""
+    values = _message_values(context, branding_context())
+    return get_skeleton(template_name, values.keys()).render(values)
+
+
+def render_email_batch(template_name, contexts):
+    """Render many emails that share a template, reusing one skeleton per distinct set of fields"""
+    branding = branding_context()
+    rendered = []
+    for context in contexts:
+        values = _message_values(context, branding)
+        rendered.append(get_skeleton(template_name, values.keys()).render(values))
+    return rendered
+
+
+def clear_caches(**kwargs):
+    _static_branding.cache_clear()
+    compiled_template.cache_clear()
+    _skeleton.cache_clear()
+
+
+def _on_setting_changed(setting, **kwargs):
+    if setting in BRANDING_SETTINGS.values() or setting == "TEMPLATES":
+        clear_caches()
+
+
+setting_changed.connect(_on_setting_changed)
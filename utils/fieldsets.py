@@ -0,0 +1,72 @@
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _parse(params, name):
+    value = params.get(name)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class FieldSelection:
+    """
+    What a read request asked for: ?fields=id,name keeps only the listed fields,
+    ?expand=media adds optional expandable ones. Writes always get every field.
+    Accepts DRF and plain Django requests.
+    """
+
+    def __init__(self, request):
+        self.fields, self.expand = None, set()
+        if request is None or request.method not in READ_METHODS:
+            return
+        params = getattr(request, 'query_params', request.GET)
+        self.fields = _parse(params, FIELDS_PARAM)
+        self.expand = _parse(params, EXPAND_PARAM) or set()
+
+    def includes(self, name):
+        """Whether a default field is rendered"""
+        return self.fields is None or name in self.fields or name in self.expand
+
+    def includes_any(self, *names):
+        return any(self.includes(name) for name in names)
+
+    def expands(self, name):
+        return name in self.expand
+
+
+class SparseFieldsetMixin:
+    """
+    Prune a serializer's fields to the request's FieldSelection before anything
+    is evaluated, and swap in `expandable_fields` named by ?expand=.
+
+    `expandable_fields` maps a field name to a zero-argument callable returning
+    the serializer field, so it can reference serializers defined later. An
+    expansion may replace a default field of the same name. Only the outermost
+    serializer of a request is pruned; nested serializers render in full.
+    Unknown names are ignored.
+    """
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_outermost():
+            return fields
+
+        selection = FieldSelection(self.context.get('request'))
+        for name, build in self.expandable_fields.items():
+            if selection.expands(name):
+                fields[name] = build()
+        if selection.fields is not None:
+            fields = {
+                name: field for name, field in fields.items()
+                if name in selection.fields or selection.expands(name)
+            }
+        return fields
+
+    def is_outermost(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
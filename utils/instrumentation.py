@@ -0,0 +1,172 @@
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more queries than its declared `query_budget` (raised when QUERY_BUDGET_STRICT)"""
+
+
+class RequestMetrics:
+    """ORM, serializer and cache cost of one request; times in milliseconds"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._serializer_depth = 0
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_time, 2),
+            'serializer_ms': round(self.serializer_time, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+def current_metrics():
+    """Metrics of the request being handled, or None outside collect_metrics()"""
+    return _current.get()
+
+
+def record_cache_lookup(hit):
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += (time.perf_counter() - started) * 1000
+
+
+@contextmanager
+def collect_metrics():
+    """Count queries on every database alias, and serializer/cache work, inside the block"""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_record_query))
+            yield metrics
+    finally:
+        _current.reset(token)
+
+
+def instrument_serializers():
+    """
+    Time `.data` on DRF serializers. Nested and list serializers all go through
+    BaseSerializer.data, so only the outermost call in a request is counted.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    if getattr(BaseSerializer.data.fget, 'instrumented', False):
+        return
+    original = BaseSerializer.data
+
+    def data(self):
+        metrics = _current.get()
+        if metrics is None or metrics._serializer_depth:
+            return original.fget(self)
+        metrics._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            metrics._serializer_depth -= 1
+            metrics.serializer_time += (time.perf_counter() - started) * 1000
+
+    data.instrumented = True
+    BaseSerializer.data = property(data)
+
+
+def query_budget_for(view_func, request):
+    """
+    The budget a DRF view declares for this request: `query_budget` as an int,
+    or a dict keyed by viewset action ({'list': 4, 'retrieve': 3}). Budgets
+    describe the default response; each ?expand= relation may add one prefetch.
+    """
+    from utils.fieldsets import FieldSelection
+
+    cls = getattr(view_func, 'cls', None)
+    budget = getattr(cls, 'query_budget', None)
+    if isinstance(budget, dict):
+        actions = getattr(view_func, 'actions', None) or {}
+        budget = budget.get(actions.get(request.method.lower()))
+    if budget is not None:
+        budget += len(FieldSelection(request).expand)
+    return budget
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Adds a Server-Timing header (db, serialize, cache, total) and one JSON log
+    line per request, and enforces views' declared query budgets.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with collect_metrics() as metrics:
+            request.query_budget = None
+            response = self.get_response(request)
+        total = (time.perf_counter() - started) * 1000
+
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={metrics.db_time:.1f};desc="{metrics.queries} queries", '
+                f'serialize;dur={metrics.serializer_time:.1f}, '
+                f'cache;desc="{metrics.cache_hits} hits {metrics.cache_misses} misses", '
+                f'total;dur={total:.1f}'
+            )
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total, 2),
+            **metrics.as_dict(),
+        }
+        if request.query_budget is not None:
+            record['query_budget'] = request.query_budget
+        if settings.REQUEST_METRICS_LOG:
+            logger.info(f"request_metrics {json.dumps(record)}")
+
+        if request.query_budget is not None and metrics.queries > request.query_budget:
+            message = (
+                f"{request.method} {request.path} ran {metrics.queries} queries, "
+                f"over its budget of {request.query_budget}"
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = query_budget_for(view_func, request)
@@ -0,0 +1,203 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connections, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from utils.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Sends for web processes without a run_mail_worker, off the request thread
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='mail-outbox')
+
+
+def enqueue_email(recipient, subject, text_body, html_body='', from_email=None):
+    """Insert one message into the outbox; without a worker process it is sent after commit"""
+    row = OutboundEmail.objects.create(
+        recipient=recipient,
+        subject=subject,
+        text_body=text_body,
+        html_body=html_body,
+        from_email=from_email if from_email is not None else settings.DEFAULT_FROM_EMAIL,
+    )
+    deliver_after_commit([row.pk])
+    return row
+
+
+def deliver_after_commit(ids):
+    """
+    When no `run_mail_worker` process is deployed (MAIL_OUTBOX_WORKER=False),
+    send the given freshly queued rows on a background thread once the
+    surrounding transaction commits, then any retries that are due. The request
+    never waits on SMTP; rows a worker already claimed are skipped.
+    """
+    if settings.MAIL_OUTBOX_WORKER or not ids:
+        return
+
+    def deliver():
+        try:
+            batch_size = settings.MAIL_OUTBOX_BATCH_SIZE
+            for start in range(0, len(ids), batch_size):
+                deliver_batch(claim_rows(ids[start:start + batch_size]))
+            deliver_batch(claim_batch(batch_size))
+        except Exception as e:
+            # The rows stay queued for the next send or a worker
+            logger.error(f"Background email delivery failed: {str(e)}")
+
+    transaction.on_commit(lambda: run_in_background(deliver))
+
+
+def run_in_background(func):
+    """Run `func` on the outbox thread pool with its own database connection"""
+    def run():
+        try:
+            func()
+        finally:
+            connections.close_all()
+
+    _executor.submit(run)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base, ... capped at MAIL_OUTBOX_RETRY_MAX_SECONDS"""
+    delay = settings.MAIL_OUTBOX_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(delay, settings.MAIL_OUTBOX_RETRY_MAX_SECONDS))
+
+
+def release_stale_claims():
+    """Put rows back in the queue whose worker died mid-send"""
+    cutoff = timezone.now() - timedelta(seconds=settings.MAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS)
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.SENDING, locked_at__lt=cutoff
+    ).update(status=OutboundEmail.PENDING, locked_at=None)
+
+
+def claim_batch(limit):
+    """
+    Atomically move up to `limit` due rows to SENDING and return them.
+    SKIP LOCKED lets several worker processes drain the same table without
+    handing the same message out twice.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.PENDING, available_at__lte=now)
+            .order_by('available_at', 'id')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        OutboundEmail.objects.filter(pk__in=ids).update(
+            status=OutboundEmail.SENDING, locked_at=now, attempts=F('attempts') + 1
+        )
+    return list(OutboundEmail.objects.filter(pk__in=ids).order_by('available_at', 'id'))
+
+
+def claim_rows(ids):
+    """Move the given rows to SENDING if they are still PENDING, and return them"""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(pk__in=ids, status=OutboundEmail.PENDING)
+            .values_list('pk', flat=True)
+        )
+        if not ids:
+            return []
+        OutboundEmail.objects.filter(pk__in=ids).update(
+            status=OutboundEmail.SENDING, locked_at=now, attempts=F('attempts') + 1
+        )
+    return list(OutboundEmail.objects.filter(pk__in=ids).order_by('available_at', 'id'))
+
+
+def _build_message(row, connection):
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.text_body,
+        from_email=row.from_email or None,
+        to=[row.recipient],
+        connection=connection,
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, 'text/html')
+    return message
+
+
+def _mark_failed(row, error):
+    if row.attempts >= settings.MAIL_OUTBOX_MAX_ATTEMPTS:
+        logger.error(f"Giving up on email {row.pk} to {row.recipient} after {row.attempts} attempts: {error}")
+        fields = {'status': OutboundEmail.FAILED}
+    else:
+        logger.warning(f"Email {row.pk} to {row.recipient} failed (attempt {row.attempts}), will retry: {error}")
+        fields = {'status': OutboundEmail.PENDING, 'available_at': timezone.now() + retry_delay(row.attempts)}
+    OutboundEmail.objects.filter(pk=row.pk).update(locked_at=None, last_error=str(error)[:2000], **fields)
+
+
+def deliver_batch(rows):
+    """
+    Send a claimed batch over one SMTP connection. Each row is handed to
+    send_messages on the already-open connection so a rejected recipient only
+    fails its own row. Returns (sent, failed, latencies in seconds).
+    """
+    sent_ids, failed, latencies = [], 0, []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for row in rows:
+            _mark_failed(row, e)
+        return 0, len(rows), latencies
+
+    try:
+        for row in rows:
+            try:
+                if connection.send_messages([_build_message(row, connection)]):
+                    sent_ids.append(row.pk)
+                    latencies.append((timezone.now() - row.created_at).total_seconds())
+                else:
+                    raise RuntimeError('backend reported 0 messages sent')
+            except Exception as e:
+                failed += 1
+                _mark_failed(row, e)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    if sent_ids:
+        OutboundEmail.objects.filter(pk__in=sent_ids).update(
+            status=OutboundEmail.SENT, sent_at=timezone.now(), locked_at=None, last_error=''
+        )
+    return len(sent_ids), failed, latencies
+
+
+def prune_sent(days=None):
+    """Delete delivered rows older than MAIL_OUTBOX_RETENTION_DAYS"""
+    days = settings.MAIL_OUTBOX_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = OutboundEmail.objects.filter(status=OutboundEmail.SENT, sent_at__lt=cutoff).delete()
+    return deleted
+
+
+def queue_metrics():
+    """Queue depth and age of the oldest due message, in one query"""
+    now = timezone.now()
+    stats = OutboundEmail.objects.aggregate(
+        pending=Count('pk', filter=Q(status=OutboundEmail.PENDING)),
+        due=Count('pk', filter=Q(status=OutboundEmail.PENDING, available_at__lte=now)),
+        sending=Count('pk', filter=Q(status=OutboundEmail.SENDING)),
+        failed=Count('pk', filter=Q(status=OutboundEmail.FAILED)),
+        oldest_due=Min('created_at', filter=Q(status=OutboundEmail.PENDING, available_at__lte=now)),
+    )
+    oldest = stats.pop('oldest_due')
+    stats['oldest_due_age_seconds'] = round((now - oldest).total_seconds(), 3) if oldest else 0.0
+    return stats
@@ -0,0 +1,100 @@
+import statistics
+import threading
+import time
+from copy import deepcopy
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.db.utils import ConnectionHandler
+
+# Separate alias so the benchmark never shares the application's pool
+ALIAS = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay request-shaped database work from several threads against the default "
+        "PostgreSQL database with per-request connections, persistent connections "
+        "(CONN_MAX_AGE) and a psycopg connection pool, and report per-request latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4, help="Concurrent worker threads")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per thread")
+        parser.add_argument("--queries", type=int, default=5, help="Queries per request")
+        parser.add_argument("--pool-max-size", type=int, default=4)
+
+    def handle(self, *args, **options):
+        base = deepcopy(settings.DATABASES["default"])
+        if not base["ENGINE"].endswith("postgresql"):
+            raise CommandError("Pooling needs the PostgreSQL backend; point DATABASE_URL at Postgres.")
+        base.get("OPTIONS", {}).pop("pool", None)
+
+        modes = {
+            "per-request": {"CONN_MAX_AGE": 0},
+            "persistent": {"CONN_MAX_AGE": 600},
+            "pooled": {
+                "CONN_MAX_AGE": 0,
+                "OPTIONS": {
+                    **base.get("OPTIONS", {}),
+                    "pool": {"min_size": 1, "max_size": options["pool_max_size"], "timeout": 30},
+                },
+            },
+        }
+        for label, overrides in modes.items():
+            handler = ConnectionHandler({"default": base, ALIAS: {**base, **overrides}})
+            latencies, opened = self.run(handler, options)
+            latencies.sort()
+            self.stdout.write(
+                f"{label:>11}: p50 {statistics.median(latencies):.2f} ms, "
+                f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms, "
+                f"{opened} server connections opened"
+            )
+            self.close(handler)
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def run(self, handler, options):
+        lock = threading.Lock()
+        latencies, opened = [], []
+
+        def count_connection(sender, connection, **kwargs):
+            if connection.alias == ALIAS:
+                with lock:
+                    opened.append(connection)
+
+        def worker():
+            connection = handler[ALIAS]
+            for _ in range(options["requests"]):
+                started = time.perf_counter()
+                # What Django does around every request (close_old_connections)
+                connection.close_if_unusable_or_obsolete()
+                with connection.cursor() as cursor:
+                    for _ in range(options["queries"]):
+                        cursor.execute("SELECT 1")
+                        cursor.fetchone()
+                connection.close_if_unusable_or_obsolete()
+                with lock:
+                    latencies.append((time.perf_counter() - started) * 1000)
+            connection.close()
+
+        connection_created.connect(count_connection)
+        try:
+            threads = [threading.Thread(target=worker) for _ in range(options["threads"])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            connection_created.disconnect(count_connection)
+
+        pool = handler[ALIAS].pool if handler.settings[ALIAS]["OPTIONS"].get("pool") else None
+        if pool is not None:
+            # Checkouts fire connection_created too; the pool knows how many it really opened
+            return latencies, pool.get_stats().get("connections_num", 0)
+        return latencies, len(opened)
+
+    def close(self, handler):
+        connection = handler[ALIAS]
+        if handler.settings[ALIAS]["OPTIONS"].get("pool"):
+            connection.close_pool()
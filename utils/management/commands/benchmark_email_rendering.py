@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from utils.email_rendering import branding_context, render_email_batch
+
+
+class Command(BaseCommand):
+    help = "Compare CPU time per message: render_to_string + strip_tags vs the cached skeleton renderer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=2000)
+        parser.add_argument("--template", default="emails/registration_verification.html")
+
+    def handle(self, *args, **options):
+        count = options["messages"]
+        contexts = [
+            {"full_name": f"Customer {i}", "verification_code": f"{i % 1000000:06d}"}
+            for i in range(count)
+        ]
+
+        started = time.process_time()
+        for context in contexts:
+            html = render_to_string(options["template"], {**branding_context(), **context})
+            strip_tags(html)
+        legacy = time.process_time() - started
+
+        started = time.process_time()
+        render_email_batch(options["template"], contexts)
+        cached = time.process_time() - started
+
+        self.stdout.write(f"render_to_string + strip_tags: {legacy / count * 1e6:.1f} us/message")
+        self.stdout.write(f"cached skeleton:               {cached / count * 1e6:.1f} us/message")
+        self.stdout.write(self.style.SUCCESS(f"Speed-up: {legacy / max(cached, 1e-9):.1f}x over {count} messages"))
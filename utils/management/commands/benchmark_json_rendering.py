@@ -0,0 +1,106 @@
+import io
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from products.models import Product, ServiceCategory
+from products.serializers import ProductListSerializer
+from utils.parsers import FastJSONParser
+from utils.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-page CPU time of DRF's stdlib JSONRenderer/JSONParser with the orjson-backed "
+        "FastJSONRenderer/FastJSONParser on an in-memory product list page; no database needed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=100, help="Products on the page")
+        parser.add_argument("--iterations", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed; FastJSONRenderer would just be the stdlib renderer.")
+        products = self.build_products(options["products"])
+        iterations = options["iterations"]
+
+        started = time.process_time()
+        for _ in range(iterations):
+            results = ProductListSerializer(products, many=True).data
+        serialize = time.process_time() - started
+
+        pages = {
+            # What ProductViewSet.list returns: fields already coerced to str by the serializer
+            "serialized page": {"count": len(products), "next": None, "previous": None, "results": results},
+            # Hand-built responses carry raw Decimal/UUID/datetime values through the encoder hook
+            "raw values page": {"count": len(products), "results": [
+                {
+                    "id": product.id,
+                    "name": product.name,
+                    "unit_price": product.unit_price,
+                    "final_price": product.effective_price,
+                    "created_at": product.created_at,
+                }
+                for product in products
+            ]},
+        }
+
+        self.stdout.write(f"ProductListSerializer: {serialize / iterations * 1e6:.0f} us/page")
+        for label, page in pages.items():
+            body = JSONRenderer().render(page)
+            if FastJSONRenderer().render(page) != body:
+                raise CommandError(f"{label}: FastJSONRenderer output differs from JSONRenderer")
+
+            stdlib = self.time_it(iterations, lambda: JSONRenderer().render(page))
+            fast = self.time_it(iterations, lambda: FastJSONRenderer().render(page))
+            self.report(f"{label}, render", stdlib, fast, iterations)
+
+            stdlib = self.time_it(iterations, lambda: JSONParser().parse(io.BytesIO(body)))
+            fast = self.time_it(iterations, lambda: FastJSONParser().parse(io.BytesIO(body)))
+            self.report(f"{label}, parse ", stdlib, fast, iterations)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(products)} products, {len(JSONRenderer().render(pages['serialized page']))} bytes per page"
+        ))
+
+    def build_products(self, count):
+        now = timezone.now()
+        category = ServiceCategory(id=uuid.uuid4(), name="Home Decor")
+        products = []
+        for i in range(count):
+            price = Decimal(1000 + i * 250)
+            product = Product(
+                id=uuid.uuid4(),
+                category=category,
+                name=f"Handmade Clay Vase {i}",
+                short_description="Glazed by hand, made to order — ships in 3 days",
+                unit_price=price,
+                effective_price=price * Decimal("0.9"),
+                rating_sum=4 * (i % 7),
+                rating_count=i % 7,
+                published=True,
+                created_at=now - timedelta(minutes=i),
+            )
+            # ProductViewSet prefetches this; an empty list keeps the benchmark off the database
+            product.image_media = []
+            products.append(product)
+        return products
+
+    def time_it(self, iterations, func):
+        started = time.process_time()
+        for _ in range(iterations):
+            func()
+        return time.process_time() - started
+
+    def report(self, label, stdlib, fast, iterations):
+        self.stdout.write(
+            f"{label}: stdlib {stdlib / iterations * 1e6:7.0f} us/page, "
+            f"orjson {fast / iterations * 1e6:6.0f} us/page ({stdlib / max(fast, 1e-9):.1f}x)"
+        )
@@ -0,0 +1,84 @@
+import socket
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent-request throughput of a running server while slow clients "
+        "trickle request bodies at it (mobile uploads). Run once against "
+        "SERVER_MODE=wsgi and once against SERVER_MODE=asgi with the same worker count."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running server")
+        parser.add_argument("--path", default="/api/v1/products/categories/", help="Endpoint the fast clients read")
+        parser.add_argument("--concurrency", type=int, default=8, help="Parallel fast clients")
+        parser.add_argument("--slow-clients", type=int, default=4, help="Clients uploading a body one chunk at a time")
+        parser.add_argument("--upload-path", default="/auth/login/", help="Endpoint the slow clients POST JSON to")
+        parser.add_argument("--duration", type=float, default=10, help="Seconds to run")
+
+    def handle(self, *args, **options):
+        base = options["url"].rstrip("/")
+        deadline = time.monotonic() + options["duration"]
+        lock = threading.Lock()
+        latencies, errors = [], []
+
+        def fast_client():
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(base + options["path"], timeout=60) as response:
+                        response.read()
+                    with lock:
+                        latencies.append((time.perf_counter() - started) * 1000)
+                except (urllib.error.URLError, OSError) as e:
+                    with lock:
+                        errors.append(str(e))
+
+        def slow_client():
+            while time.monotonic() < deadline:
+                try:
+                    self.trickle_upload(base, options["upload_path"], deadline)
+                except OSError:
+                    pass
+
+        threads = [threading.Thread(target=slow_client) for _ in range(options["slow_clients"])]
+        threads += [threading.Thread(target=fast_client) for _ in range(options["concurrency"])]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        if not latencies:
+            self.stderr.write(f"No successful requests; first error: {errors[0] if errors else 'none'}")
+            return
+        latencies.sort()
+        self.stdout.write(
+            f"{len(latencies)} requests in {elapsed:.1f}s with {options['slow_clients']} slow uploads: "
+            f"{len(latencies) / elapsed:.1f} req/sec, p50 {statistics.median(latencies):.1f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f} ms, {len(errors)} errors"
+        )
+
+    def trickle_upload(self, base, path, deadline, chunk=b" " * 64, interval=0.25):
+        """POST a body that arrives one small chunk per interval until the run ends"""
+        parsed = urllib.parse.urlsplit(base)
+        chunks = max(1, int((deadline - time.monotonic()) / interval))
+        with socket.create_connection((parsed.hostname, parsed.port or 80), timeout=60) as sock:
+            sock.sendall(
+                f"POST {path} HTTP/1.1\r\nHost: {parsed.netloc}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(chunk) * chunks}\r\nConnection: close\r\n\r\n".encode()
+            )
+            for _ in range(chunks):
+                sock.sendall(chunk)
+                time.sleep(interval)
+            sock.recv(4096)
@@ -0,0 +1,179 @@
+import json
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from products.models import Product
+from utils.management.commands.seed_benchmark_data import (
+    BENCHMARK_PASSWORD,
+    CATEGORY_PREFIX,
+    USER_EMAIL_PREFIX,
+)
+
+SEARCH_TERMS = ["vase", "oak", "handmade", "lamp", "brass basket"]
+
+
+class Rollback(Exception):
+    """Raised to undo the writes made by the write scenarios"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot endpoints in-process against data from seed_benchmark_data: product list, "
+        "search and detail, login, wishlist toggle and order create. Writes latency percentiles "
+        "and query counts to a JSON file so runs on different commits can be compared."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50, help="Timed requests per endpoint")
+        parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per endpoint")
+        parser.add_argument("--output", default="benchmark-results.json")
+        parser.add_argument("--compare", help="Earlier results file to print p50 deltas against")
+        parser.add_argument(
+            "--with-cache", action="store_true",
+            help="Keep the product response cache on (off by default so every request hits the database)",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = list(User.objects.filter(email__startswith=USER_EMAIL_PREFIX).order_by("email")[:50])
+        # toggle can't create a first wishlist (Wishlist.product is required), so use users that have one
+        wishlist_users = list(
+            User.objects.filter(email__startswith=USER_EMAIL_PREFIX, wishlisted_by__isnull=False)
+            .distinct().order_by("email")[:50]
+        )
+        products = list(
+            Product.objects.filter(category__name__startswith=CATEGORY_PREFIX, published=True)
+            .order_by("-created_at")
+            .values_list("id", flat=True)[:200]
+        )
+        if not wishlist_users or not products:
+            raise CommandError("No benchmark data found; run seed_benchmark_data first.")
+
+        overrides = {
+            "ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"],
+            "AUTH_THROTTLE_ENABLED": False,
+            "PRODUCTS_CACHE_ENABLED": options["with_cache"] and settings.PRODUCTS_CACHE_ENABLED,
+            "REQUEST_METRICS_LOG": False,
+        }
+        reads = {
+            "product_list": lambda client, i: client.get("/api/v1/products/products/"),
+            "product_search": lambda client, i: client.get(
+                "/api/v1/products/products/", {"search": SEARCH_TERMS[i % len(SEARCH_TERMS)]}
+            ),
+            "product_detail": lambda client, i: client.get(
+                f"/api/v1/products/products/{products[i % len(products)]}/"
+            ),
+        }
+        writes = {
+            "login": lambda client, i: client.post(
+                "/auth/login/",
+                {"email": users[i % len(users)].email, "password": BENCHMARK_PASSWORD},
+                format="json",
+            ),
+            "wishlist_toggle": lambda client, i: self.as_user(
+                client, wishlist_users[i % len(wishlist_users)]
+            ).post(
+                "/api/v1/products/wishlist-items/toggle/",
+                {"product": str(products[i % len(products)])},
+                format="json",
+            ),
+            "order_create": lambda client, i: self.as_user(client, users[i % len(users)]).post(
+                "/api/v1/orders/orders/",
+                {"items": [
+                    {"product_id": i % 1000, "quantity": 1, "price_at_purchase": "2500.00"},
+                    {"product_id": (i + 7) % 1000, "quantity": 2, "price_at_purchase": "1500.00"},
+                ]},
+                format="json",
+            ),
+        }
+
+        endpoints = {}
+        with override_settings(**overrides):
+            for name, call in reads.items():
+                endpoints[name] = self.measure(name, call, options)
+            # Writes run in one transaction that is rolled back, so repeated runs see the same dataset
+            try:
+                with transaction.atomic():
+                    for name, call in writes.items():
+                        endpoints[name] = self.measure(name, call, options)
+                    raise Rollback
+            except Rollback:
+                pass
+
+        results = {
+            "git_sha": self.git_sha(),
+            "timestamp": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "cache": overrides["PRODUCTS_CACHE_ENABLED"],
+            "iterations": options["iterations"],
+            "dataset": {
+                "users": User.objects.filter(email__startswith=USER_EMAIL_PREFIX).count(),
+                "products": Product.objects.filter(category__name__startswith=CATEGORY_PREFIX).count(),
+            },
+            "endpoints": endpoints,
+        }
+        Path(options["output"]).write_text(json.dumps(results, indent=2))
+
+        previous = None
+        if options["compare"]:
+            previous = json.loads(Path(options["compare"]).read_text()).get("endpoints", {})
+        for name, stats in endpoints.items():
+            line = (
+                f"{name:>16}: p50 {stats['p50_ms']:7.2f} ms, p95 {stats['p95_ms']:7.2f} ms, "
+                f"{stats['queries']} queries"
+            )
+            if previous and name in previous:
+                before = previous[name]["p50_ms"]
+                line += f"  (p50 {(stats['p50_ms'] - before) / before * 100:+.1f}% vs {options['compare']})"
+            self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def as_user(self, client, user):
+        client.force_authenticate(user=user)
+        return client
+
+    def measure(self, name, call, options):
+        client = APIClient()
+        for i in range(options["warmup"]):
+            self.check_response(name, call(client, i))
+
+        latencies, queries = [], []
+        for i in range(options["warmup"], options["warmup"] + options["iterations"]):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = call(client, i)
+                latencies.append((time.perf_counter() - started) * 1000)
+            self.check_response(name, response)
+            queries.append(len(captured))
+
+        latencies.sort()
+        return {
+            "n": len(latencies),
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(latencies[max(int(len(latencies) * 0.95) - 1, 0)], 3),
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "queries": max(queries),
+        }
+
+    def check_response(self, name, response):
+        if response.status_code >= 400:
+            raise CommandError(f"{name} returned {response.status_code}: {response.content[:200]!r}")
+
+    def git_sha(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,142 @@
+import json
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from utils.db_pool import pool_stats
+from utils.mail_outbox import (
+    claim_batch,
+    deliver_batch,
+    prune_sent,
+    queue_metrics,
+    release_stale_claims,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drain the email outbox with a bounded pool of senders. Each batch shares one "
+        "SMTP connection; failures are retried with exponential backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=settings.MAIL_WORKER_CONCURRENCY,
+            help="Concurrent sender threads (each holds at most one SMTP connection)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.MAIL_OUTBOX_BATCH_SIZE,
+            help="Messages claimed and sent per SMTP connection",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=settings.MAIL_WORKER_POLL_SECONDS,
+            help="Seconds to sleep when nothing is due",
+        )
+        parser.add_argument(
+            "--metrics-interval", type=float, default=60,
+            help="Seconds between queue depth/latency log lines",
+        )
+        parser.add_argument("--once", action="store_true", help="Exit when no message is due")
+        parser.add_argument("--stats", action="store_true", help="Print queue metrics as JSON and exit")
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            self.stdout.write(json.dumps(queue_metrics()))
+            return
+
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.reset_counters()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.request_stop)
+            signal.signal(signal.SIGINT, self.request_stop)
+
+        workers = max(1, options["workers"])
+        slots = threading.BoundedSemaphore(workers)
+        last_report = last_housekeeping = 0.0
+        totals = {"sent": 0, "failed": 0}
+
+        self.stdout.write(f"Mail worker started with {workers} sender(s), batch size {options['batch_size']}")
+        # A single sender runs inline; more get a bounded thread pool
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mail-worker") if workers > 1 else None
+        try:
+            while not self.stopping.is_set():
+                now = time.monotonic()
+                if now - last_housekeeping >= 300:
+                    release_stale_claims()
+                    prune_sent()
+                    last_housekeeping = now
+                if now - last_report >= options["metrics_interval"]:
+                    self.report(totals)
+                    last_report = now
+
+                # Only claim when a sender is free, so claimed rows never sit waiting
+                slots.acquire()
+                batch = claim_batch(options["batch_size"])
+                if not batch:
+                    slots.release()
+                    if options["once"]:
+                        break
+                    self.stopping.wait(options["poll_interval"])
+                    continue
+                if pool is None:
+                    self.send_batch(batch, slots)
+                else:
+                    pool.submit(self.send_batch, batch, slots, True)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+        self.report(totals)
+        self.stdout.write(self.style.SUCCESS(
+            f"Mail worker stopped: {totals['sent']} sent, {totals['failed']} failed"
+        ))
+
+    def request_stop(self, signum, frame):
+        self.stopping.set()
+
+    def send_batch(self, batch, slots, in_thread=False):
+        try:
+            sent, failed, latencies = deliver_batch(batch)
+            with self.lock:
+                self.sent += sent
+                self.failed += failed
+                self.latencies.extend(latencies)
+        except Exception as e:
+            logger.error(f"Mail worker batch failed: {str(e)}")
+        finally:
+            if in_thread:
+                connections.close_all()
+            slots.release()
+
+    def reset_counters(self):
+        self.sent = 0
+        self.failed = 0
+        self.latencies = []
+
+    def report(self, totals):
+        with self.lock:
+            sent, failed, latencies = self.sent, self.failed, self.latencies
+            self.reset_counters()
+        totals["sent"] += sent
+        totals["failed"] += failed
+
+        metrics = queue_metrics()
+        metrics.update({
+            "sent": sent,
+            "send_failures": failed,
+            "latency_avg_seconds": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "latency_max_seconds": round(max(latencies), 3) if latencies else None,
+        })
+        db_pool = pool_stats()
+        if db_pool:
+            metrics["db_pool"] = db_pool
+        logger.info(f"mail_outbox {json.dumps(metrics)}")
@@ -0,0 +1,264 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from products.cache import bump_version
+from products.models import (
+    Discount,
+    Feedback,
+    Product,
+    ProductDiscount,
+    ProductMedia,
+    ServiceCategory,
+    Wishlist,
+    WishlistItem,
+)
+from products.pricing import refresh_effective_prices
+from products.product_counts import recompute_product_counts
+from products.ratings import recompute_ratings
+from products.search import update_search_vectors
+from products.slugs import allocate_slugs
+
+# Every seeded row is recognisable by these, so --flush never touches real data
+USER_EMAIL = "bench-user-{}@example.com"
+USER_EMAIL_PREFIX = "bench-user-"
+CATEGORY_NAME = "Benchmark Category {}"
+CATEGORY_PREFIX = "Benchmark Category "
+DISCOUNT_PREFIX = "Benchmark Discount "
+BENCHMARK_PASSWORD = "Benchmark-pass-123"
+
+ADJECTIVES = ["Rustic", "Modern", "Handmade", "Carved", "Woven", "Glazed", "Polished", "Minimal", "Vintage", "Painted"]
+MATERIALS = ["Clay", "Oak", "Bamboo", "Brass", "Sisal", "Stone", "Walnut", "Glass", "Leather", "Resin"]
+NOUNS = ["Vase", "Bowl", "Lamp", "Basket", "Chair", "Frame", "Tray", "Stool", "Mirror", "Figurine"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create a reproducible benchmark dataset: users, categories, products, media, "
+        "feedback, discounts, wishlists and orders. Rows are inserted with bulk_create in "
+        "batches; the same --seed always yields the same data. Never run against production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--products", type=int, default=10000)
+        parser.add_argument("--media-per-product", type=int, default=3)
+        parser.add_argument("--feedback-per-product", type=int, default=2)
+        parser.add_argument("--discounts", type=int, default=10)
+        parser.add_argument(
+            "--discounted-ratio", type=float, default=0.2, help="Share of products with a discount attached"
+        )
+        parser.add_argument("--wishlists", type=int, default=500, help="Users that get a wishlist")
+        parser.add_argument("--wishlist-items", type=int, default=5, help="Items per wishlist")
+        parser.add_argument("--orders", type=int, default=2000)
+        parser.add_argument("--max-order-items", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=42, help="Random seed; same seed, same dataset")
+        parser.add_argument("--flush", action="store_true", help="Delete previously seeded benchmark rows first")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        started = time.monotonic()
+
+        if options["flush"]:
+            self.flush()
+        elif ServiceCategory.objects.filter(name__startswith=CATEGORY_PREFIX).exists():
+            raise CommandError("Benchmark data already exists; rerun with --flush to replace it.")
+
+        users = self.seed_users(options["users"])
+        categories = self.seed_categories(options["categories"])
+        products = self.seed_products(categories, options["products"])
+        self.seed_media(products, options["media_per_product"])
+        self.seed_feedback(products, options["feedback_per_product"])
+        self.seed_discounts(products, options["discounts"], options["discounted_ratio"])
+        self.seed_wishlists(users[:options["wishlists"]], products, options["wishlist_items"])
+        self.seed_orders(users, products, options["orders"], options["max_order_items"])
+
+        # bulk_create skips save() and signals: rebuild the maintained columns and drop cached responses
+        seeded = Product.objects.filter(category__name__startswith=CATEGORY_PREFIX)
+        refresh_effective_prices(seeded.filter(product_discounts__isnull=False).distinct(), self.batch_size)
+        recompute_ratings(seeded, self.batch_size)
+        recompute_product_counts(ServiceCategory.objects.filter(name__startswith=CATEGORY_PREFIX))
+        update_search_vectors(seeded)
+        bump_version(
+            "servicecategory", "product", "productmedia", "feedback", "discount", "productdiscount"
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded benchmark data in {time.monotonic() - started:.1f}s "
+            f"(password for every user: {BENCHMARK_PASSWORD})"
+        ))
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def bulk_create(self, model, objs):
+        """Insert in batch_size chunks, each in its own transaction; returns the objects"""
+        for start in range(0, len(objs), self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(objs[start:start + self.batch_size])
+        self.stdout.write(f"  {model._meta.verbose_name_plural}: {len(objs)}")
+        return objs
+
+    def flush(self):
+        User = get_user_model()
+        Order.objects.filter(user__email__startswith=USER_EMAIL_PREFIX).delete()
+        User.objects.filter(email__startswith=USER_EMAIL_PREFIX).delete()
+        Product.objects.filter(category__name__startswith=CATEGORY_PREFIX).delete()
+        ServiceCategory.objects.filter(name__startswith=CATEGORY_PREFIX).delete()
+        Discount.objects.filter(name__startswith=DISCOUNT_PREFIX).delete()
+        self.stdout.write("Removed previous benchmark data")
+
+    def seed_users(self, count):
+        User = get_user_model()
+        # One hash for everyone: hashing per user would dominate the seeding time
+        password = make_password(BENCHMARK_PASSWORD)
+        return self.bulk_create(User, [
+            User(
+                id=self.uuid(),
+                email=USER_EMAIL.format(i),
+                full_name=f"Benchmark User {i}",
+                phone_number=f"09{i:08d}",
+                password=password,
+                is_active=True,
+            )
+            for i in range(count)
+        ])
+
+    def seed_categories(self, count):
+        return self.bulk_create(ServiceCategory, [
+            ServiceCategory(
+                id=self.uuid(),
+                name=CATEGORY_NAME.format(i),
+                slug=f"benchmark-category-{i}",
+                description="Benchmark data",
+                pricing_type=self.rng.choice(["fixed", "custom"]),
+            )
+            for i in range(count)
+        ])
+
+    def seed_products(self, categories, count):
+        now = timezone.now()
+        products = []
+        for i in range(count):
+            name = f"{self.rng.choice(ADJECTIVES)} {self.rng.choice(MATERIALS)} {self.rng.choice(NOUNS)} {i}"
+            price = Decimal(self.rng.randrange(1000, 500000, 500))
+            products.append(Product(
+                id=self.uuid(),
+                category=categories[i % len(categories)],
+                name=name,
+                short_description=f"{name}, made to order",
+                detailed_description=f"Benchmark product {i}. " * 5,
+                unit_price=price,
+                effective_price=price,
+                published=self.rng.random() < 0.9,
+            ))
+        self.bulk_create(Product, allocate_slugs(products))
+        # auto_now_add overrides created_at on insert; spread it afterwards so
+        # "newest first" orderings and cursors see distinct timestamps
+        for index, product in enumerate(products):
+            product.created_at = now - timedelta(minutes=index)
+        # bulk_update builds one CASE WHEN per row; SQLite caps expression depth at 1000
+        Product.objects.bulk_update(products, ["created_at"], batch_size=min(self.batch_size, 500))
+        return products
+
+    def seed_media(self, products, per_product):
+        return self.bulk_create(ProductMedia, [
+            ProductMedia(
+                id=self.uuid(),
+                product=product,
+                image=f"products/images/benchmark/{i}-{order}.jpg",
+                alt_text=product.name,
+                display_order=order,
+            )
+            for i, product in enumerate(products)
+            for order in range(per_product)
+        ])
+
+    def seed_feedback(self, products, per_product):
+        return self.bulk_create(Feedback, [
+            Feedback(
+                id=self.uuid(),
+                product=product,
+                client_name=f"Client {self.rng.randrange(100000)}",
+                message="Benchmark feedback",
+                rating=self.rng.randint(1, 5),
+                published=self.rng.random() < 0.8,
+            )
+            for product in products
+            for _ in range(per_product)
+        ])
+
+    def seed_discounts(self, products, count, ratio):
+        if not count:
+            return []
+        now = timezone.now()
+        discounts = self.bulk_create(Discount, [
+            Discount(
+                id=self.uuid(),
+                name=f"{DISCOUNT_PREFIX}{i}",
+                discount_type=Discount.PERCENTAGE if i % 2 == 0 else Discount.FIXED,
+                discount_value=Decimal(self.rng.choice([5, 10, 15, 20])) if i % 2 == 0 else Decimal(500),
+                start_date=now - timedelta(days=1),
+                end_date=now + timedelta(days=30),
+            )
+            for i in range(count)
+        ])
+        discounted = self.rng.sample(products, int(len(products) * ratio))
+        return self.bulk_create(ProductDiscount, [
+            ProductDiscount(id=self.uuid(), product=product, discount=self.rng.choice(discounts))
+            for product in discounted
+        ])
+
+    def seed_wishlists(self, users, products, per_wishlist):
+        if not users or not per_wishlist:
+            return []
+        wishlists, items = [], []
+        for user in users:
+            chosen = self.rng.sample(products, min(per_wishlist, len(products)))
+            wishlist = Wishlist(id=self.uuid(), user=user, product=chosen[0])
+            wishlists.append(wishlist)
+            items.extend(WishlistItem(id=self.uuid(), wishlist=wishlist, product=product) for product in chosen)
+        self.bulk_create(Wishlist, wishlists)
+        self.bulk_create(WishlistItem, items)
+        return wishlists
+
+    def seed_orders(self, users, products, count, max_items):
+        if not users or not count:
+            return []
+        orders, lines = [], []
+        for _ in range(count):
+            indexes = self.rng.sample(range(len(products)), min(self.rng.randint(1, max_items), len(products)))
+            picked = [(index, self.rng.randint(1, 3)) for index in indexes]
+            order_lines = [
+                # OrderItem.product_id is an integer column; store the product's position in the dataset
+                OrderItem(product_id=index, quantity=quantity, price_at_purchase=products[index].unit_price)
+                for index, quantity in picked
+            ]
+            total = sum(line.price_at_purchase * line.quantity for line in order_lines)
+            orders.append(Order(
+                user=self.rng.choice(users),
+                total_amount=total,
+                status=self.rng.choice([status for status, _ in Order.STATUS_CHOICES]),
+            ))
+            lines.append(order_lines)
+        self.bulk_create(Order, orders)
+        if not orders or orders[0].pk is None:
+            # Backends that can't return ids from a bulk insert
+            raise CommandError("This database backend does not return ids from bulk_create; cannot seed order items.")
+        for order, order_lines in zip(orders, lines):
+            for line in order_lines:
+                line.order = order
+        self.bulk_create(OrderItem, [line for order_lines in lines for line in order_lines])
+        return orders
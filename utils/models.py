@@ -1,3 +1,60 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class OutboundEmail(models.Model):
+    """
+    Durable outbox row for one rendered email. Requests only insert here;
+    `manage.py run_mail_worker` claims pending rows and delivers them (or, with
+    MAIL_OUTBOX_WORKER=False, the web process right after commit).
+    """
+
+    PENDING = 'PENDING'
+    SENDING = 'SENDING'
+    SENT = 'SENT'
+    FAILED = 'FAILED'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    recipient = models.EmailField()
+    from_email = models.CharField(max_length=254, blank=True)
+    subject = models.CharField(max_length=255)
+    text_body = models.TextField()
+    html_body = models.TextField(blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Earliest time the next attempt may run; pushed back on each failure
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['available_at', 'id']
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Outbound Emails'
+        indexes = [
+            # The worker's claim query: due pending rows, oldest first
+            models.Index(
+                fields=['available_at', 'id'],
+                name='outbox_due_idx',
+                condition=models.Q(status='PENDING'),
+            ),
+            models.Index(
+                fields=['locked_at'],
+                name='outbox_sending_idx',
+                condition=models.Q(status='SENDING'),
+            ),
+            models.Index(fields=['status', 'created_at'], name='outbox_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
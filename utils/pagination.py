@@ -0,0 +1,70 @@
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class KnownCountPaginator(Paginator):
+    """Django Paginator that takes the row count from the caller instead of running COUNT(*)"""
+
+    def __init__(self, object_list, per_page, known_count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = known_count
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        return super().count
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+    No COUNT(*) and no OFFSET, so every page costs the same however deep the client scrolls.
+    """
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        # The keyset must stay fixed; ?ordering= only applies to page-number mode
+        return self.ordering
+
+
+class SelectablePagination(PageNumberPagination):
+    """
+    Page-number pagination by default. Infinite-scroll clients opt into cursor
+    pagination per request with ?pagination=cursor; the `next`/`previous` links
+    they receive keep the mode.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_pagination_class = CreatedAtCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request):
+        return request.query_params.get(self.mode_query_param) == self.cursor_mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        self.cursor_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.mode_query_param,
+            'required': False,
+            'in': 'query',
+            'description': "Set to 'cursor' for keyset pagination (no count, constant cost per page).",
+            'schema': {'type': 'string', 'enum': [self.cursor_mode]},
+        })
+        parameters.extend(self.cursor_pagination_class().get_schema_operation_parameters(view))
+        return parameters
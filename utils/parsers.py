@@ -0,0 +1,37 @@
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from utils.renderers import FastJSONRenderer, orjson
+
+# orjson turns integers beyond 64 bits into floats; 19+ digits in a row may be
+# one of them (or just a long string or fraction), so such bodies use the stdlib.
+# Mapping every digit to b'0' and searching for a run is a few times cheaper than
+# a regex scan and than orjson itself.
+DIGITS_TO_ZERO = bytes(48 if 48 <= byte <= 57 else 32 for byte in range(256))
+LONG_DIGIT_RUN = b'0' * 19
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser backed by orjson for UTF-8 bodies. Anything orjson rejects is
+    re-parsed by the stdlib parser, so errors and edge cases read exactly as
+    before; other encodings, bodies that may hold integers wider than 64 bits
+    and a missing orjson go straight to it.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_DIGIT_RUN in body.translate(DIGITS_TO_ZERO):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,43 @@
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional: everything falls back to DRF's stdlib renderer
+    orjson = None
+
+# orjson emits datetimes with microseconds and "+00:00"; hand them to DRF's
+# encoder instead so output matches JSONRenderer (millisecond precision, "Z")
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+LINE_SEPARATORS = (('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson. Output is byte-for-byte what JSONRenderer
+    produces for compact responses: UUIDs natively, and Decimal, datetime,
+    lazy strings and querysets through DRF's own encoder. Pretty-printing,
+    non-default UNICODE_JSON/COMPACT_JSON, a missing orjson and anything orjson
+    can't encode (e.g. integers over 64 bits) all use the stdlib renderer.
+    """
+    default = encoders.JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same strict-javascript-subset escaping as JSONRenderer
+        for raw, escaped in LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
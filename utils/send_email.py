@@ -1,57 +1,84 @@
 import logging
-import threading
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Tuple
 from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
-from django.core.mail import EmailMultiAlternatives
+
+from utils.email_rendering import render_email, render_email_batch
 
 logger = logging.getLogger(__name__)
 
 
-def _send_email_thread(recipient, subject, html_content, text_content):
-    """Runs in background thread — actually sends the email"""
+def send_email_custom(
+    recipient: str,
+    subject: str,
+    template: str,
+    context: Dict[str, Any]
+) -> bool:
+    """
+    Render the template and queue the message in the outbox.
+    Delivery happens in `manage.py run_mail_worker` when one is deployed
+    (MAIL_OUTBOX_WORKER=True); otherwise a background thread of this process
+    sends it after the current transaction commits. Either way this never
+    waits on SMTP.
+    Branding values are filled in by utils.email_rendering; `context` only needs
+    what is specific to this message.
+    """
+    from utils.mail_outbox import enqueue_email
+
     try:
-        email = EmailMultiAlternatives(
+        html_content, text_content = render_email(template, context)
+
+        enqueue_email(
+            recipient=recipient,
             subject=subject,
-            body=text_content,
+            text_body=text_content,
+            html_body=html_content,
             from_email=settings.EMAIL_HOST_USER,
-            to=[recipient],
         )
-        email.attach_alternative(html_content, "text/html")
-        result = email.send(fail_silently=False)
-
-        if result:
-            logger.info(f"Email sent successfully to {recipient}: {subject}")
-        else:
-            logger.warning(f"Email send returned 0 for {recipient}: {subject}")
+        return True
 
     except Exception as e:
-        logger.error(f"Failed to send email to {recipient}: {subject}. Error: {str(e)}")
+        logger.error(f"Failed to queue email to {recipient}: {subject}. Error: {str(e)}")
+        raise
 
 
-def send_email_custom(
-    recipient: str,
+def send_bulk_email(
     subject: str,
     template: str,
-    context: Dict[str, Any]
-) -> bool:
-    
-    try:
-        # Render template in main thread (fast, no I/O)
-        html_content = render_to_string(template, context)
-        text_content = strip_tags(html_content)
-
-        # Send email in background thread (slow SMTP I/O)
-        thread = threading.Thread(
-            target=_send_email_thread,
-            args=(recipient, subject, html_content, text_content),
-            daemon=True
-        )
-        thread.start()
+    messages: Iterable[Tuple[str, Dict[str, Any]]],
+    batch_size: int = 500,
+) -> int:
+    """
+    Queue one email per (recipient, context) pair, e.g. a campaign to every customer.
+    Messages are rendered and inserted `batch_size` at a time. Returns the number queued.
+    """
+    from utils.mail_outbox import deliver_after_commit
+    from utils.models import OutboundEmail
 
-        return True
+    queued = 0
+    batch = []
 
-    except Exception as e:
-        logger.error(f"Failed to prepare email to {recipient}: {subject}. Error: {str(e)}")
-        raise
\ No newline at end of file
+    def flush():
+        rendered = render_email_batch(template, [context for _, context in batch])
+        rows = OutboundEmail.objects.bulk_create([
+            OutboundEmail(
+                recipient=recipient,
+                subject=subject,
+                text_body=text_content,
+                html_body=html_content,
+                from_email=settings.EMAIL_HOST_USER,
+            )
+            for (recipient, _), (html_content, text_content) in zip(batch, rendered)
+        ])
+        deliver_after_commit([row.pk for row in rows if row.pk is not None])
+        return len(batch)
+
+    for message in messages:
+        batch.append(message)
+        if len(batch) >= batch_size:
+            queued += flush()
+            batch = []
+    if batch:
+        queued += flush()
+
+    logger.info(f"Queued {queued} emails: {subject}")
+    return queued
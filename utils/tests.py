@@ -1,4 +1,281 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+import dj_database_url
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.translation import gettext_lazy
 
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+from products.models import Product
+from rwoogaBackend.database import apply_pool_options
+from utils.db_pool import pooled_aliases
+from utils.email_rendering import branding_context, render_email
+from utils.parsers import FastJSONParser
+from utils.renderers import FastJSONRenderer
+from utils.mail_outbox import claim_batch, deliver_batch, queue_metrics
+from utils.models import OutboundEmail
+from utils.send_email import send_bulk_email, send_email_custom
+
+
+@override_settings(MAIL_OUTBOX_MAX_ATTEMPTS=2, MAIL_OUTBOX_RETRY_BASE_SECONDS=30)
+class MailOutboxTest(TestCase):
+
+    def queue(self, recipient='client@example.com'):
+        send_email_custom(
+            recipient=recipient,
+            subject='Verify Your Email',
+            template='emails/registration_verification.html',
+            context={'full_name': 'Test User', 'verification_code': '123456'},
+        )
+
+    @override_settings(MAIL_OUTBOX_WORKER=True)
+    def test_send_email_custom_only_enqueues(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.queue()
+        self.assertEqual(len(mail.outbox), 0)
+        row = OutboundEmail.objects.get()
+        self.assertEqual(row.status, OutboundEmail.PENDING)
+        self.assertIn('123456', row.html_body)
+        self.assertIn('123456', row.text_body)
+
+    @override_settings(MAIL_OUTBOX_WORKER=False)
+    def test_without_worker_mail_is_sent_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.queue()
+            send_bulk_email('News', 'emails/registration_verification.html', [
+                ('a@example.com', {'full_name': 'A', 'verification_code': '1'}),
+                ('b@example.com', {'full_name': 'B', 'verification_code': '2'}),
+            ])
+        self.assertEqual(len(mail.outbox), 0)
+
+        background = []
+        with patch('utils.mail_outbox.run_in_background', background.append):
+            for callback in callbacks:
+                callback()
+        # Committing only hands the send to the thread pool
+        self.assertEqual(len(mail.outbox), 0)
+
+        for deliver in background:
+            deliver()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.SENT).exists())
+
+    def test_worker_drains_queue_in_batches(self):
+        for i in range(3):
+            self.queue(f'client{i}@example.com')
+
+        call_command('run_mail_worker', '--once', '--batch-size', '2', '--workers', '1', stdout=open('/dev/null', 'w'))
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.SENT).exists())
+        self.assertEqual(queue_metrics()['pending'], 0)
+
+    def test_failed_send_backs_off_then_gives_up(self):
+        self.queue()
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('refused')):
+            deliver_batch(claim_batch(10))
+            row = OutboundEmail.objects.get()
+            self.assertEqual(row.status, OutboundEmail.PENDING)
+            self.assertEqual(row.attempts, 1)
+            self.assertGreater(row.available_at, timezone.now() + timedelta(seconds=20))
+            # Not due yet
+            self.assertEqual(claim_batch(10), [])
+
+            OutboundEmail.objects.update(available_at=timezone.now())
+            deliver_batch(claim_batch(10))
+
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboundEmail.FAILED)
+        self.assertEqual(row.last_error, 'refused')
+        self.assertEqual(queue_metrics()['failed'], 1)
+
+
+class EmailRenderingTest(TestCase):
+    template = 'emails/password_reset_verification.html'
+
+    def test_matches_full_template_render(self):
+        context = {'full_name': 'Test User', 'reset_code': '654321'}
+        html, text = render_email(self.template, context)
+
+        expected = render_to_string(self.template, {**branding_context(), **context})
+        self.assertEqual(html, expected)
+        self.assertEqual(text, strip_tags(expected))
+
+    def test_values_escaped_in_html_only(self):
+        html, text = render_email(self.template, {'full_name': 'Ann & <Bob>', 'reset_code': '1'})
+        self.assertIn('Ann &amp; &lt;Bob&gt;', html)
+        self.assertIn('Ann & <Bob>', text)
+
+    @override_settings(COMPANY_NAME='Renamed Co')
+    def test_branding_follows_settings(self):
+        html, _ = render_email(self.template, {'full_name': 'Test User', 'reset_code': '1'})
+        self.assertIn('Renamed Co', html)
+
+    def test_bulk_send_inserts_per_batch(self):
+        messages = [
+            (f'client{i}@example.com', {'full_name': f'Client {i}', 'reset_code': f'{i:06d}'})
+            for i in range(5)
+        ]
+        with self.assertNumQueries(3):
+            queued = send_bulk_email('News', self.template, messages, batch_size=2)
+        self.assertEqual(queued, 5)
+        row = OutboundEmail.objects.get(recipient='client3@example.com')
+        self.assertIn('000003', row.html_body)
+        self.assertIn('Client 3', row.text_body)
+
+
+class AsgiApplicationTest(TestCase):
+    """The DRF views are served unchanged through the ASGI handler (SERVER_MODE=asgi)"""
+
+    async def test_catalog_and_auth_over_asgi(self):
+        response = await self.async_client.get('/api/v1/products/categories/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('results', response.json())
+
+        response = await self.async_client.post(
+            '/auth/login/', {'email': 'nobody@example.com', 'password': 'wrong'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('X-RateLimit-Remaining', response)
+
+
+class DatabasePoolConfigTest(TestCase):
+
+    def parse(self, url):
+        return apply_pool_options(dj_database_url.parse(url, conn_max_age=600))
+
+    def test_pool_options_from_url(self):
+        database = self.parse('postgres://u:p@db.example.com/shop?pool=true&pool_max_size=2&pool_timeout=2.5&sslmode=require')
+        self.assertEqual(database['OPTIONS'], {
+            'sslmode': 'require',
+            'pool': {'max_size': 2, 'min_size': 2, 'timeout': 2.5},
+        })
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+
+    def test_defaults_and_opt_out(self):
+        self.assertIs(self.parse('postgres://u:p@db/shop?pool=1')['OPTIONS']['pool'], True)
+        database = self.parse('postgres://u:p@db/shop')
+        self.assertNotIn('pool', database.get('OPTIONS', {}))
+        self.assertEqual(database['CONN_MAX_AGE'], 600)
+
+    def test_rejects_inconsistent_urls(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.parse('postgres://u:p@db/shop?pool_max_size=4')
+        with self.assertRaises(ImproperlyConfigured):
+            self.parse('postgres://u:p@db/shop?pool=true&pool_max_size=many')
+        with self.assertRaises(ImproperlyConfigured):
+            self.parse('sqlite:///db.sqlite3?pool=true')
+
+    def test_pool_stats_endpoint_is_staff_only(self):
+        client = APIClient()
+        url = '/api/v1/system/db-pool/'
+        self.assertEqual(client.get(url).status_code, 401)
+
+        staff = get_user_model().objects.create_user(
+            email='staff@example.com', full_name='Staff', phone_number='0780000001',
+            password='testpass123', is_staff=True, is_active=True,
+        )
+        client.force_authenticate(staff)
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['pooled'], bool(pooled_aliases()))
+        self.assertEqual(set(response.json()['pools']), set(pooled_aliases()))
+
+
+class BenchmarkCommandsTest(TestCase):
+
+    def test_seed_then_run_benchmarks_writes_results(self):
+        out = StringIO()
+        call_command(
+            'seed_benchmark_data', '--users', '5', '--categories', '2', '--products', '20',
+            '--wishlists', '2', '--orders', '5', '--batch-size', '7', stdout=out,
+        )
+        self.assertEqual(Product.objects.filter(category__name__startswith='Benchmark Category ').count(), 20)
+        self.assertTrue(OrderItem.objects.exists())
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'results.json'
+            call_command(
+                'run_benchmarks', '--iterations', '3', '--warmup', '1', '--output', str(output), stdout=out,
+            )
+            results = json.loads(output.read_text())
+
+        self.assertEqual(results['dataset'], {'users': 5, 'products': 20})
+        self.assertEqual(
+            set(results['endpoints']),
+            {'product_list', 'product_search', 'product_detail', 'login', 'wishlist_toggle', 'order_create'},
+        )
+        # Write scenarios are rolled back
+        self.assertEqual(Order.objects.count(), 5)
+
+
+class FastJSONTest(TestCase):
+
+    def payload(self):
+        return {
+            'id': uuid.uuid4(),
+            'unit_price': Decimal('1500.50'),
+            'created_at': timezone.now().replace(microsecond=123456),
+            'day': date(2025, 1, 31),
+            'label': gettext_lazy('Home decor'),
+            'note': 'line\u2028break \u2014 ok',
+            'results': [{'n': i, 'price': Decimal(i)} for i in range(3)],
+        }
+
+    def test_renders_exactly_like_json_renderer(self):
+        payload = self.payload()
+        self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_falls_back_for_indent_and_big_integers(self):
+        payload = {'big': 2 ** 70, **self.payload()}
+        self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+        self.assertEqual(
+            FastJSONRenderer().render(payload, 'application/json; indent=4'),
+            JSONRenderer().render(payload, 'application/json; indent=4'),
+        )
+        with patch('utils.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_parser_matches_json_parser(self):
+        body = JSONRenderer().render(self.payload())
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+        with self.assertRaises(ParseError) as fast:
+            FastJSONParser().parse(io.BytesIO(b'{"a": NaN}'))
+        with self.assertRaises(ParseError) as stdlib:
+            JSONParser().parse(io.BytesIO(b'{"a": NaN}'))
+        self.assertEqual(str(fast.exception), str(stdlib.exception))
+
+    def test_parser_keeps_integers_wider_than_64_bits(self):
+        body = b'{"id": 18446744073709551616, "small": -9223372036854775809, "ok": 1}'
+        parsed = FastJSONParser().parse(io.BytesIO(body))
+        self.assertEqual(parsed, {'id': 2 ** 64, 'small': -2 ** 63 - 1, 'ok': 1})
+        self.assertIsInstance(parsed['id'], int)
+
+    def test_api_uses_fast_renderer_and_parser(self):
+        response = self.client.post(
+            '/auth/login/', data=b'{"email": "nobody@example.com"', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
@@ -1,3 +1,14 @@
-from django.shortcuts import render
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from utils.db_pool import pool_stats
+
+
+class DatabasePoolStatsView(APIView):
+    """Connection pool counters of the worker process that serves the request (staff only)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        stats = pool_stats()
+        return Response({'pooled': bool(stats), 'pools': stats})